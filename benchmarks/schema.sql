@@ -0,0 +1,84 @@
+-- Minimal schema for a throwaway benchmark database.
+-- Mirrors the tables the pipeline reads and writes (see README "Database Schema").
+-- Never point the benchmarks at a real database: every scenario TRUNCATEs these tables.
+
+CREATE TABLE IF NOT EXISTS companies (
+    id              SERIAL PRIMARY KEY,
+    yc_company_id   TEXT UNIQUE,
+    name            TEXT,
+    domain          TEXT,
+    founded_year    INT,
+    first_seen_at   TIMESTAMP DEFAULT NOW(),
+    last_seen_at    TIMESTAMP DEFAULT NOW(),
+    is_active       BOOLEAN DEFAULT TRUE,
+    search_vector   TSVECTOR
+);
+CREATE INDEX IF NOT EXISTS idx_companies_search ON companies USING GIN (search_vector);
+
+CREATE TABLE IF NOT EXISTS company_snapshots (
+    id              SERIAL PRIMARY KEY,
+    company_id      INT REFERENCES companies(id) ON DELETE CASCADE,
+    batch           TEXT,
+    stage           TEXT,
+    description     TEXT,
+    location        TEXT,
+    tags            JSONB,
+    employee_range  TEXT,
+    scraped_at      TIMESTAMP DEFAULT NOW(),
+    data_hash       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_company_time ON company_snapshots (company_id, scraped_at DESC);
+
+CREATE TABLE IF NOT EXISTS company_changes (
+    id              SERIAL PRIMARY KEY,
+    company_id      INT REFERENCES companies(id) ON DELETE CASCADE,
+    change_type     TEXT,
+    old_value       TEXT,
+    new_value       TEXT,
+    detected_at     TIMESTAMP DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_changes_company_time ON company_changes (company_id, detected_at DESC);
+
+CREATE TABLE IF NOT EXISTS company_scores (
+    company_id        INT PRIMARY KEY REFERENCES companies(id) ON DELETE CASCADE,
+    momentum_score    NUMERIC DEFAULT 0,
+    stability_score   NUMERIC DEFAULT 100,
+    last_computed_at  TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS company_ai_insights (
+    id              SERIAL PRIMARY KEY,
+    company_id      INT REFERENCES companies(id) ON DELETE CASCADE,
+    insight_type    TEXT,
+    content         TEXT,
+    model_name      TEXT,
+    snapshot_id     INT,
+    source_hash     TEXT,
+    generated_at    TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS company_web_enrichment (
+    company_id        INT PRIMARY KEY REFERENCES companies(id) ON DELETE CASCADE,
+    has_careers_page  BOOLEAN,
+    has_blog          BOOLEAN,
+    contact_email     TEXT,
+    scraped_at        TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    id                       SERIAL PRIMARY KEY,
+    started_at               TIMESTAMP,
+    ended_at                 TIMESTAMP,
+    completed_at             TIMESTAMP,
+    status                   TEXT,
+    total_companies          INT,
+    new_companies            INT,
+    updated_companies        INT,
+    unchanged_companies      INT,
+    failed_companies         INT,
+    companies_found          INT,
+    companies_added          INT,
+    companies_updated        INT,
+    companies_failed         INT,
+    avg_time_per_company_ms  NUMERIC
+);
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import re
+import socket
+
+from aiohttp import web
+
+# === LOCAL STAND-INS ===
+# Small aiohttp servers on 127.0.0.1 that replace everything the pipeline
+# talks to over HTTP. Each start_* returns (runner, base_url).
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _start(app):
+    port = free_port()
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, f"http://127.0.0.1:{port}"
+
+
+# -----------------------------
+# Fake Algolia
+# -----------------------------
+class FakeAlgolia:
+    """Serves `hits` through POST /1/indexes/*/queries in the fetch_batch response shape."""
+
+    def __init__(self, hits, latency_ms=0):
+        self.hits = hits
+        self.latency_ms = latency_ms
+        self.requests = 0
+
+    async def queries(self, request):
+        self.requests += 1
+        payload = await request.json()
+        params = payload["requests"][0].get("params", "")
+        per_page = int(re.search(r"hitsPerPage=(\d+)", params).group(1))
+        page = int(re.search(r"page=(\d+)", params).group(1))
+
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        page_hits = self.hits[page * per_page:(page + 1) * per_page]
+        return web.json_response({"results": [{
+            "hits": page_hits,
+            "page": page,
+            "hitsPerPage": per_page,
+            "nbHits": len(self.hits),
+            "nbPages": (len(self.hits) + per_page - 1) // per_page,
+        }]})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/1/indexes/{index}/queries", self.queries)
+        runner, base = await _start(app)
+        return runner, f"{base}/1/indexes/*/queries"
+
+
+# -----------------------------
+# Web farm for the Enricher
+# -----------------------------
+HOMEPAGE = "<html><body><a href='/careers'>Careers</a> <a href='/blog'>Blog</a> hello@bench.test</body></html>"
+SITEMAP = "<urlset><url><loc>/careers</loc></url><url><loc>/blog</loc></url></urlset>"
+
+
+def _site(kind, slow_ms=1500, huge_mb=5):
+    async def handler(request):
+        if kind == "hung":
+            # never answers, the client timeout / budget has to save us
+            await asyncio.sleep(3600)
+        if kind == "slow":
+            await asyncio.sleep(slow_ms / 1000)
+        if kind == "huge":
+            return web.Response(text=HOMEPAGE + ("x" * 1024 * 1024 * huge_mb), content_type="text/html")
+
+        path = request.path.rstrip("/")
+        if path in ("/careers", "/jobs", "/blog"):
+            return web.Response(text="<html>ok</html>", content_type="text/html")
+        if path == "/sitemap.xml":
+            return web.Response(text=SITEMAP, content_type="application/xml")
+        if path == "/robots.txt":
+            return web.Response(text="User-agent: *\nSitemap: /sitemap.xml\n")
+        if path:
+            raise web.HTTPNotFound()
+        return web.Response(text=HOMEPAGE, content_type="text/html")
+    return handler
+
+
+async def start_web_farm(kinds=("ok", "slow", "hung", "huge")):
+    """
+    One site per kind, each on its own port (= its own host for connection reuse).
+    "dead" is a port nobody listens on. Returns (runners, {kind: "127.0.0.1:port"}).
+    """
+    runners, hosts = [], {}
+    for kind in kinds:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", _site(kind))
+        runner, base = await _start(app)
+        runners.append(runner)
+        hosts[kind] = base.replace("http://", "")
+    hosts["dead"] = f"127.0.0.1:{free_port()}"
+    return runners, hosts
+
+
+# -----------------------------
+# Stub Ollama
+# -----------------------------
+class StubOllama:
+    """POST /api/generate with a fixed latency. Understands the batched JSON summary prompt."""
+
+    def __init__(self, latency_ms=200):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    async def generate(self, request):
+        self.calls += 1
+        body = await request.json()
+        await asyncio.sleep(self.latency_ms / 1000)
+
+        if body.get("format") == "json":
+            ids = re.findall(r"^\[(\d+)\]", body["prompt"], re.MULTILINE)
+            text = json.dumps({"summaries": [{"id": i, "summary": f"Stub summary {i}."} for i in ids]})
+        else:
+            text = "Stub answer from the benchmark Ollama."
+        return web.json_response({"model": body.get("model"), "response": text, "done": True})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/api/generate", self.generate)
+        runner, base = await _start(app)
+        return runner, f"{base}/api/generate"
@@ -0,0 +1,76 @@
+import random
+
+# === SYNTHETIC DIRECTORY DATA ===
+# Records come out in the raw Algolia hit shape, so they can go through
+# normalize_company() / the fake Algolia server exactly like real ones.
+
+BATCHES = [f"{s}{y}" for y in range(15, 26) for s in ("W", "S")]
+STAGES = ["Active", "Active", "Active", "Acquired", "Public", "Inactive"]
+LOCATIONS = [
+    "San Francisco, CA, USA", "New York, NY, USA", "London, UK", "Bangalore, India",
+    "Berlin, Germany", "Toronto, Canada", "Remote", "Austin, TX, USA", "Paris, France",
+]
+TAGS = [
+    "B2B", "SaaS", "Fintech", "AI", "Developer Tools", "Healthcare", "Consumer",
+    "Marketplace", "Climate", "Education", "Security", "Infrastructure", "Robotics",
+    "Analytics", "E-commerce", "Logistics", "Biotech", "Open Source",
+]
+WORDS = (
+    "platform api automation data teams payments workflow cloud open source analytics "
+    "machine learning agents infrastructure developers hospitals clinics logistics "
+    "marketplace insurance banking compliance security monitoring robots energy "
+    "carbon students creators retail supply chain"
+).split()
+
+
+def _sentence(rng, n=10):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def make_company(rng, i):
+    return {
+        "objectID": str(100000 + i),
+        "slug": f"bench-co-{i}",
+        "name": f"Bench Co {i}",
+        "website": None,
+        "batch": rng.choice(BATCHES),
+        "status": rng.choice(STAGES),
+        "one_liner": _sentence(rng),
+        "location": rng.choice(LOCATIONS),
+        "tags": rng.sample(TAGS, rng.randint(1, 4)),
+        "team_size": rng.choice([None, 2, 5, 10, 25, 50, 120]),
+    }
+
+
+def mutate(rng, hit):
+    """One realistic change: stage, location, tags or description."""
+    hit = dict(hit)
+    field = rng.choice(["status", "location", "tags", "one_liner"])
+    if field == "status":
+        hit["status"] = rng.choice([s for s in STAGES if s != hit["status"]])
+    elif field == "location":
+        hit["location"] = rng.choice([l for l in LOCATIONS if l != hit["location"]])
+    elif field == "tags":
+        hit["tags"] = rng.sample(TAGS, rng.randint(1, 4))
+    else:
+        hit["one_liner"] = _sentence(rng)
+    return hit
+
+
+def generate_runs(n_companies, n_runs, change_rate, seed=42, website=None):
+    """
+    n_runs successive directory states. Between runs, `change_rate` of the
+    companies get one field changed. Same seed -> same data.
+    `website(i)` can assign a domain per company (used for the web farm).
+    """
+    rng = random.Random(seed)
+    current = [make_company(rng, i) for i in range(n_companies)]
+    if website:
+        for i, hit in enumerate(current):
+            hit["website"] = website(i)
+
+    runs = [current]
+    for _ in range(n_runs - 1):
+        current = [mutate(rng, h) if rng.random() < change_rate else h for h in current]
+        runs.append(current)
+    return runs
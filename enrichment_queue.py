@@ -0,0 +1,177 @@
+import os
+import re
+import socket
+
+# === QUEUE CONFIG ===
+# how long a worker owns a claimed batch before someone else may take it over
+LEASE_SECONDS = 120
+# dead sites get retried with exponential backoff, then parked
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_S = 300        # 5 min, 10 min, 20 min ...
+BACKOFF_MAX_S = 6 * 3600
+# finished domains come back for a re-check after this long
+REFRESH_AFTER_DAYS = 7
+
+
+def worker_name():
+    """Unique per process, so leases can be traced back to a machine + pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# -----------------------------
+# Schema + Seeding
+# -----------------------------
+# plain SQL (no params) so the sync psycopg2 worker can run it too
+QUEUE_DDL = """
+        CREATE TABLE IF NOT EXISTS enrichment_queue (
+            company_id       INT PRIMARY KEY REFERENCES companies(id) ON DELETE CASCADE,
+            status           TEXT NOT NULL DEFAULT 'pending',   -- pending | leased | done | dead
+            attempts         INT NOT NULL DEFAULT 0,
+            leased_by        TEXT,
+            lease_expires_at TIMESTAMP,
+            next_attempt_at  TIMESTAMP NOT NULL DEFAULT NOW(),
+            last_error       TEXT,
+            updated_at       TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_enrichment_queue_claim
+            ON enrichment_queue (status, next_attempt_at);
+"""
+
+SEED_SQL = """
+        INSERT INTO enrichment_queue (company_id)
+        SELECT id FROM companies WHERE domain IS NOT NULL
+        ON CONFLICT (company_id) DO NOTHING
+"""
+
+# done rows past REFRESH_AFTER_DAYS go back to pending
+REQUEUE_STALE_SQL = f"""
+        UPDATE enrichment_queue
+        SET status = 'pending', attempts = 0, next_attempt_at = NOW(),
+            leased_by = NULL, lease_expires_at = NULL, last_error = NULL, updated_at = NOW()
+        WHERE status = 'done' AND updated_at < NOW() - INTERVAL '{REFRESH_AFTER_DAYS} days'
+"""
+
+# --refresh: everything finished or dead gets a new pass
+REFRESH_SQL = """
+        UPDATE enrichment_queue
+        SET status = 'pending', attempts = 0, next_attempt_at = NOW(),
+            leased_by = NULL, lease_expires_at = NULL, last_error = NULL, updated_at = NOW()
+        WHERE status IN ('done', 'dead')
+"""
+
+
+async def ensure_queue(conn):
+    await conn.execute(QUEUE_DDL)
+
+
+async def seed_queue(conn, refresh=False):
+    """
+    Add every company with a domain that isn't queued yet.
+    Safe to run from every worker at startup, it's idempotent.
+    Finished rows older than REFRESH_AFTER_DAYS are re-queued;
+    refresh=True puts every finished / dead row back to pending for a new pass.
+    """
+    added = await conn.execute(SEED_SQL)
+    await conn.execute(REFRESH_SQL if refresh else REQUEUE_STALE_SQL)
+    return added
+
+
+# -----------------------------
+# Claim / Ack / Fail
+# -----------------------------
+# one copy of every statement, asyncpg placeholders; the sync worker runs them through psycopg()
+
+# an expired lease counts as a failed attempt: a domain that keeps killing its
+# worker is parked instead of going round forever
+PARK_EXPIRED_SQL = """
+        UPDATE enrichment_queue
+        SET status = 'dead', leased_by = NULL, lease_expires_at = NULL,
+            last_error = 'lease expired', updated_at = NOW()
+        WHERE status = 'leased' AND lease_expires_at < NOW() AND attempts >= $1
+"""
+
+CLAIM_SQL = """
+        WITH picked AS (
+            SELECT q.company_id
+            FROM enrichment_queue q
+            JOIN companies c ON c.id = q.company_id
+            WHERE c.is_active = TRUE
+              AND ((q.status = 'pending' AND q.next_attempt_at <= NOW())
+                OR (q.status = 'leased' AND q.lease_expires_at < NOW()))
+            ORDER BY q.next_attempt_at
+            LIMIT $1
+            FOR UPDATE OF q SKIP LOCKED
+        )
+        UPDATE enrichment_queue q
+        SET status = 'leased',
+            leased_by = $2,
+            lease_expires_at = NOW() + make_interval(secs => $3),
+            attempts = q.attempts + 1,
+            updated_at = NOW()
+        FROM picked, companies c
+        WHERE q.company_id = picked.company_id
+          AND c.id = q.company_id
+        RETURNING q.company_id AS id, c.domain, q.attempts
+"""
+
+RENEW_SQL = """
+        UPDATE enrichment_queue
+        SET lease_expires_at = NOW() + make_interval(secs => $3), updated_at = NOW()
+        WHERE company_id = ANY($1::int[]) AND leased_by = $2 AND status = 'leased'
+"""
+
+COMPLETE_SQL = """
+        UPDATE enrichment_queue
+        SET status = 'done', leased_by = NULL, lease_expires_at = NULL,
+            last_error = NULL, updated_at = NOW()
+        WHERE company_id = ANY($1::int[]) AND leased_by = $2
+"""
+
+# back off per domain; after MAX_ATTEMPTS the row is parked as 'dead'
+FAIL_SQL = """
+        UPDATE enrichment_queue
+        SET status = CASE WHEN attempts >= $3 THEN 'dead' ELSE 'pending' END,
+            next_attempt_at = NOW() + make_interval(
+                secs => LEAST($4 * power(2, attempts - 1), $5)
+            ),
+            leased_by = NULL,
+            lease_expires_at = NULL,
+            last_error = $6,
+            updated_at = NOW()
+        WHERE company_id = ANY($1::int[]) AND leased_by = $2
+"""
+
+
+def psycopg(sql):
+    """$1, $2 ... -> %(p1)s, %(p2)s ... for psycopg2; pass the values through psycopg_args()."""
+    return re.sub(r"\$(\d+)", r"%(p\1)s", sql.replace("%", "%%"))
+
+
+def psycopg_args(*args):
+    return {f"p{i}": value for i, value in enumerate(args, 1)}
+
+
+async def claim_batch(conn, worker, size):
+    """
+    Lease up to `size` domains. SKIP LOCKED means parallel workers never
+    block on or double-claim the same rows; expired leases (crashed worker)
+    become claimable again until they run out of attempts.
+    """
+    await conn.execute(PARK_EXPIRED_SQL, MAX_ATTEMPTS)
+    return await conn.fetch(CLAIM_SQL, size, worker, LEASE_SECONDS)
+
+
+async def renew(conn, worker, company_ids):
+    """Push the lease out again for rows still being worked on."""
+    if not company_ids: return
+    await conn.execute(RENEW_SQL, company_ids, worker, LEASE_SECONDS)
+
+
+async def complete(conn, worker, company_ids):
+    if not company_ids: return
+    await conn.execute(COMPLETE_SQL, company_ids, worker)
+
+
+async def fail(conn, worker, company_ids, error="unreachable"):
+    if not company_ids: return
+    await conn.execute(FAIL_SQL, company_ids, worker, MAX_ATTEMPTS, BACKOFF_BASE_S, BACKOFF_MAX_S, error)
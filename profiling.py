@@ -0,0 +1,273 @@
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# === PROFILING CONFIG ===
+# sampler: how often every thread's stack is recorded
+SAMPLE_INTERVAL_S = 0.005
+# event loop: a callback / task step running longer than this blocked everything else
+SLOW_CALLBACK_S = 0.05
+SLOW_CALLBACKS_KEPT = 100
+TASK_SAMPLE_INTERVAL_S = 1.0
+
+# output lands next to the logs (scraper.log etc. are written to the cwd)
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".")
+
+
+def add_profile_argument(parser):
+    parser.add_argument(
+        "--profile", nargs="?", const="sample", choices=["sample", "cprofile"], default=None,
+        help="profile the run: sample = stack sampler -> .folded (flamegraph.pl / speedscope), "
+             "cprofile = deterministic -> .pstats (snakeviz / flameprof)"
+    )
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    # ';' separates frames in the folded format
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+# -----------------------------
+# Stack Sampler
+# -----------------------------
+class StackSampler:
+    """
+    Background thread that records every other thread's stack every
+    SAMPLE_INTERVAL_S. Time spent idle in the event loop's select() shows up
+    as such, so "waiting on Postgres / the network" is visible too.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# -----------------------------
+# Event Loop Monitor
+# -----------------------------
+class LoopMonitor:
+    """
+    Times every event-loop callback (task steps included) by wrapping
+    asyncio.Handle._run, and samples the live task set once a second.
+    """
+
+    def __init__(self, slow_s=SLOW_CALLBACK_S):
+        self.slow_s = slow_s
+        self.callbacks = 0
+        self.busy_s = 0.0
+        self.slow = []              # (duration_s, label, at)
+        self.slow_by_label = Counter()
+        self.slow_time_by_label = Counter()
+        self.peak_tasks = 0
+        self.task_peaks = Counter()  # coroutine -> most tasks alive at once
+        self._original_run = None
+        self._sampler = None
+
+    @staticmethod
+    def _label(handle):
+        cb = getattr(handle, "_callback", None)
+        owner = getattr(cb, "__self__", None)
+        if isinstance(owner, asyncio.Task):
+            coro = owner.get_coro()
+            return f"task {getattr(coro, '__qualname__', repr(coro))}"
+        return getattr(cb, "__qualname__", repr(cb))
+
+    def install(self):
+        monitor = self
+        original = self._original_run = asyncio.events.Handle._run
+
+        def timed_run(handle):
+            t0 = time.perf_counter()
+            try:
+                return original(handle)
+            finally:
+                took = time.perf_counter() - t0
+                monitor.callbacks += 1
+                monitor.busy_s += took
+                if took >= monitor.slow_s:
+                    label = monitor._label(handle)
+                    monitor.slow_by_label[label] += 1
+                    monitor.slow_time_by_label[label] += took
+                    monitor.slow.append((took, label, datetime.now().isoformat(timespec="seconds")))
+                    if len(monitor.slow) > SLOW_CALLBACKS_KEPT * 2:
+                        monitor.slow = sorted(monitor.slow, reverse=True)[:SLOW_CALLBACKS_KEPT]
+
+        asyncio.events.Handle._run = timed_run
+
+    def uninstall(self):
+        if self._original_run is not None:
+            asyncio.events.Handle._run = self._original_run
+            self._original_run = None
+
+    async def _sample_tasks(self):
+        while True:
+            tasks = asyncio.all_tasks()
+            self.peak_tasks = max(self.peak_tasks, len(tasks))
+            counts = Counter(getattr(t.get_coro(), "__qualname__", "?") for t in tasks)
+            for name, n in counts.items():
+                self.task_peaks[name] = max(self.task_peaks[name], n)
+            await asyncio.sleep(TASK_SAMPLE_INTERVAL_S)
+
+    def start_task_sampler(self):
+        self._sampler = asyncio.get_running_loop().create_task(self._sample_tasks())
+
+    def stop_task_sampler(self):
+        if self._sampler:
+            self._sampler.cancel()
+
+    def report(self, wall_s):
+        return {
+            "wall_s": round(wall_s, 3),
+            "loop_callbacks": self.callbacks,
+            "loop_busy_s": round(self.busy_s, 3),
+            "loop_busy_pct": round(100 * self.busy_s / wall_s, 1) if wall_s else None,
+            "slow_callback_threshold_ms": self.slow_s * 1000,
+            "slow_callbacks_total": sum(self.slow_by_label.values()),
+            "slow_callbacks_by_source": [
+                {"source": label, "count": n, "total_ms": round(self.slow_time_by_label[label] * 1000, 1)}
+                for label, n in self.slow_by_label.most_common(20)
+            ],
+            "slowest_callbacks": [
+                {"ms": round(took * 1000, 1), "source": label, "at": at}
+                for took, label, at in sorted(self.slow, reverse=True)[:SLOW_CALLBACKS_KEPT]
+            ],
+            "peak_tasks": self.peak_tasks,
+            "peak_tasks_by_coroutine": dict(self.task_peaks.most_common(20)),
+        }
+
+
+# -----------------------------
+# Run Profiler
+# -----------------------------
+class RunProfiler:
+    """
+    --profile for the entry points.
+
+        profiler = RunProfiler("scraper", args.profile)
+        profiler.start()
+        asyncio.run(profiler.watch_loop(main()))   # async entry points
+        profiler.stop()
+        profiler.save(run_id)                       # scrape_runs id goes in the file names
+
+    mode None = disabled, every method is a no-op.
+    """
+
+    def __init__(self, name, mode, out_dir=PROFILE_DIR):
+        self.name = name
+        self.mode = mode
+        self.out_dir = out_dir
+        self.sampler = None
+        self.cprofile = None
+        self.loop = None
+        self.t0 = None
+        self.wall_s = 0.0
+
+    @property
+    def enabled(self):
+        return self.mode is not None
+
+    def start(self):
+        if not self.enabled:
+            return
+        self.t0 = time.perf_counter()
+        if self.mode == "cprofile":
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        else:
+            self.sampler = StackSampler()
+            self.sampler.start()
+        logging.info(f"Profiling {self.name} ({self.mode})")
+
+    def stop(self):
+        if not self.enabled or self.t0 is None:
+            return
+        if self.cprofile:
+            self.cprofile.disable()
+        if self.sampler:
+            self.sampler.stop()
+        self.wall_s = time.perf_counter() - self.t0
+
+    async def watch_loop(self, coro):
+        """Run `coro` with the event-loop monitor attached."""
+        if not self.enabled:
+            return await coro
+        self.loop = LoopMonitor()
+        self.loop.install()
+        self.loop.start_task_sampler()
+        try:
+            return await coro
+        finally:
+            self.loop.stop_task_sampler()
+            self.loop.uninstall()
+
+    def save(self, run_id=None):
+        """Write the profile files and return their paths."""
+        if not self.enabled:
+            return []
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(
+            self.out_dir,
+            f"profile-{self.name}-run{run_id if run_id is not None else 'none'}-{datetime.now():%Y%m%d-%H%M%S}"
+        )
+        paths = []
+
+        if self.cprofile:
+            self.cprofile.dump_stats(base + ".pstats")
+            paths.append(base + ".pstats")
+        if self.sampler:
+            self.sampler.write_folded(base + ".folded")
+            paths.append(base + ".folded")
+
+        report = {
+            "entry_point": self.name,
+            "scrape_run_id": run_id,
+            "mode": self.mode,
+            "wall_s": round(self.wall_s, 3),
+            "samples": self.sampler.samples if self.sampler else None,
+            "asyncio": self.loop.report(self.wall_s) if self.loop else None,
+        }
+        with open(base + "-report.json", "w") as f:
+            json.dump(report, f, indent=2)
+        paths.append(base + "-report.json")
+
+        for p in paths:
+            logging.info(f"Profile written: {p}")
+        return paths
@@ -4,7 +4,7 @@ import json
 import time
 import logging
 import psycopg2
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from datetime import datetime
 
 # === CONFIGURATION ===
@@ -22,6 +22,49 @@ logging.basicConfig(
     ]
 )
 
+# === BROWSER HELPERS ===
+CARD_SELECTOR = 'a[href*="/companies/"]'
+# how long to wait for new cards after a scroll before we call it the bottom
+SCROLL_IDLE_TIMEOUT_MS = 8000
+
+# one round trip for every card instead of inner_text() + get_attribute() per element
+EXTRACT_CARDS_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).map(a => {
+    const lines = a.innerText.split('\\n');
+    return {
+        href: a.getAttribute('href'),
+        name: lines[0],
+        location: lines.length > 1 ? lines[1] : 'Unknown',
+        description: lines.length > 2 ? lines[2] : ''
+    };
+})
+"""
+
+async def count_cards(page):
+    return await page.evaluate("(s) => document.querySelectorAll(s).length", CARD_SELECTOR)
+
+async def scroll_until_loaded(page):
+    """Scroll until the card count stops growing. No fixed sleeps, we wait on the DOM / network."""
+    count = await count_cards(page)
+    while True:
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        try:
+            # returns as soon as the next page of cards is rendered
+            await page.wait_for_function(
+                "([s, n]) => document.querySelectorAll(s).length > n",
+                arg=[CARD_SELECTOR, count], timeout=SCROLL_IDLE_TIMEOUT_MS
+            )
+        except PlaywrightTimeoutError:
+            # nothing new yet, give in-flight requests a chance before deciding we're done
+            try:
+                await page.wait_for_load_state("networkidle", timeout=SCROLL_IDLE_TIMEOUT_MS)
+            except PlaywrightTimeoutError:
+                pass
+        new_count = await count_cards(page)
+        if new_count <= count:
+            return new_count
+        count = new_count
+
 def get_db_connection():
     return psycopg2.connect(DB_CONFIG)
 
@@ -55,34 +98,21 @@ async def scrape_with_playwright():
             
             # === INFINITE SCROLL ===
             logging.info("Starting Infinite Scroll...")
-            last_height = await page.evaluate("document.body.scrollHeight")
-            
-            while True:
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000) 
-                new_height = await page.evaluate("document.body.scrollHeight")
-                if new_height == last_height:
-                    logging.info("Reached bottom of page.")
-                    break
-                last_height = new_height
-                logging.info("Scrolled deeper...")
+            total_cards = await scroll_until_loaded(page)
+            logging.info(f"Reached bottom of page ({total_cards} cards).")
 
             # === EXTRACT DATA ===
-            company_elements = await page.query_selector_all('a[href*="/companies/"]') 
-            logging.info(f"Found {len(company_elements)} company elements. Processing...")
+            cards = await page.evaluate(EXTRACT_CARDS_JS, CARD_SELECTOR)
+            logging.info(f"Found {len(cards)} company elements. Processing...")
 
-            for el in company_elements:
+            for card in cards:
                 stats['found'] += 1
                 try:
                     # Extract Data
-                    raw_text = await el.inner_text()
-                    href = await el.get_attribute('href')
-                    full_url = f"https://www.ycombinator.com{href}"
-                    
-                    lines = raw_text.split('\n')
-                    name = lines[0] if lines else "Unknown"
-                    location = lines[1] if len(lines) > 1 else "Unknown"
-                    description = lines[2] if len(lines) > 2 else ""
+                    full_url = f"https://www.ycombinator.com{card['href']}"
+                    name = card['name']
+                    location = card['location']
+                    description = card['description']
                     
                     # --- DATABASE OPERATIONS ---
                     cursor.execute("""
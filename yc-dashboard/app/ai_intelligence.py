@@ -1,3 +1,4 @@
+import json
 import requests
 
 OLLAMA_URL = "http://localhost:11434/api/generate"
@@ -56,15 +57,99 @@ Rules:
 - Answer in 3–5 sentences
 """
 
+    return _call_ollama(prompt)
+
+
+def answer_question(question, context):
+    """
+    Cross-company question, answered from a retrieved context
+    (see app.retrieval). Same model, same rules.
+    """
+    prompt = f"""
+You are an internal AI analyst for a YC company intelligence system.
+
+Relevant companies (name | batch | stage | location | momentum | tags | description,
+followed by their most recent changes):
+{context or "No matching companies found."}
+
+User Question:
+"{question}"
+
+Rules:
+- Use ONLY the information above
+- Do NOT guess or hallucinate
+- Name the companies you are referring to
+- Be factual and concise
+"""
+    return _call_ollama(prompt)
+
+
+def generate_company_summaries(companies):
+    """
+    Several SUMMARY insights in one call. Each company dict carries a "key"
+    plus the usual fields and a list of (change_type, old, new) tuples.
+    Returns {key: summary}; companies the model skipped are simply missing.
+    """
+    blocks = []
+    for c in companies:
+        if c.get("changes"):
+            changes_text = "; ".join(f"{t}: {old} → {new}" for t, old, new in c["changes"])
+        else:
+            changes_text = "none"
+        blocks.append(
+            f"[{c['key']}] {c.get('name')} | Stage: {c.get('stage')} | Batch: {c.get('batch')}\n"
+            f"Description: {c.get('description')}\n"
+            f"Tags: {', '.join(c.get('tags') or [])}\n"
+            f"Recent changes: {changes_text}"
+        )
+    companies_text = "\n\n".join(blocks)
+
+    prompt = f"""
+You are an internal AI analyst for a YC company intelligence system.
+Write a 2 sentence summary for EACH company below.
+
+{companies_text}
+
+Rules:
+- Use ONLY the information above
+- Do NOT guess or hallucinate
+- Reply with JSON only, in this exact shape:
+  {{"summaries": [{{"id": "<the id in brackets>", "summary": "<text>"}}]}}
+"""
+
+    raw = _call_ollama(prompt, fmt="json", timeout=60 + 15 * len(companies))
+    if not raw:
+        return {}
+
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        print("Ollama returned invalid JSON for batch summary")
+        return {}
+
+    items = data.get("summaries", []) if isinstance(data, dict) else data
+    out = {}
+    for item in items if isinstance(items, list) else []:
+        if isinstance(item, dict) and item.get("id") is not None and item.get("summary"):
+            out[str(item["id"]).strip("[] ")] = str(item["summary"]).strip()
+    return out
+
+
+def _call_ollama(prompt, fmt=None, timeout=60):
+    body = {
+        "model": MODEL,
+        "prompt": prompt,
+        "stream": False
+    }
+    if fmt:
+        # Ollama constrains the output to valid JSON
+        body["format"] = fmt
+
     try:
         response = requests.post(
             OLLAMA_URL,
-            json={
-                "model": MODEL,
-                "prompt": prompt,
-                "stream": False
-            },
-            timeout=60
+            json=body,
+            timeout=timeout
         )
 
         if response.status_code != 200:
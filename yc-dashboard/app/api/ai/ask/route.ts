@@ -4,16 +4,21 @@ export async function POST(req: Request) {
   try {
     const { companyId, question } = await req.json();
 
-    if (!companyId || !question) {
+    if (!question) {
       return NextResponse.json(
-        { error: "companyId and question are required" },
+        { error: "question is required" },
         { status: 400 }
       );
     }
 
     // 🔁 Proxy request to FastAPI (Ollama + RAG lives there)
+    // no companyId -> cross-company question, FastAPI retrieves the companies
+    const target = companyId
+      ? `http://127.0.0.1:8000/api/companies/${companyId}/explain`
+      : `http://127.0.0.1:8000/api/ask`;
+
     const res = await fetch(
-      `http://127.0.0.1:8000/api/companies/${companyId}/explain`,
+      target,
       {
         method: "POST",
         headers: {
@@ -35,6 +40,7 @@ export async function POST(req: Request) {
 
     return NextResponse.json({
       answer: data.answer,
+      companies: data.companies,
     });
 
   } catch (err) {
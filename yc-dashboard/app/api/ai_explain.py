@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import os
+import asyncio
+import logging
 
-from app.db_logic import get_db_pool
-from app.ai_intelligence import generate_company_explanation
+from app.api.deps import get_pool
+from app.ai_intelligence import generate_company_explanation, answer_question
+from app.retrieval import retrieve_context
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -11,14 +15,15 @@ class ExplainRequest(BaseModel):
     question: str
 
 
+class AskRequest(BaseModel):
+    question: str
+    top_n: int = 15
+
+
 @router.post("/companies/{company_id}/explain")
 async def explain_company(company_id: int, payload: ExplainRequest):
 
-    db_url = os.getenv("DB_URL")
-    if not db_url:
-        raise HTTPException(status_code=500, detail="DB_URL not set")
-
-    pool = await get_db_pool(db_url)
+    pool = await get_pool()
 
     async with pool.acquire() as conn:
         company = await conn.fetchrow("""
@@ -47,7 +52,9 @@ async def explain_company(company_id: int, payload: ExplainRequest):
             WHERE company_id = $1
         """, company_id)
 
-    explanation = generate_company_explanation(
+    # blocking HTTP to Ollama, run it in a thread so the loop keeps serving
+    explanation = await asyncio.to_thread(
+        generate_company_explanation,
         company=dict(company),
         changes=[dict(c) for c in changes],
         scores=dict(scores) if scores else {},
@@ -60,3 +67,26 @@ async def explain_company(company_id: int, payload: ExplainRequest):
         }
 
     return {"answer": explanation}
+
+
+@router.post("/ask")
+async def ask(payload: AskRequest):
+    """Questions across companies: retrieve the relevant ones first, then ask the LLM."""
+
+    pool = await get_pool()
+
+    async with pool.acquire() as conn:
+        context, companies, retrieval_ms = await retrieve_context(
+            conn, payload.question, top_n=min(max(payload.top_n, 1), 50)
+        )
+
+    logger.info(f"ask: prompt context {len(context)} chars, retrieval {retrieval_ms:.1f}ms")
+
+    # requests is blocking, keep it off the event loop (SSE + cache listener live there too)
+    answer = await asyncio.to_thread(answer_question, payload.question, context)
+
+    return {
+        "answer": answer or "AI could not generate an answer at this time.",
+        "companies": [{"id": c["id"], "name": c["name"]} for c in companies],
+        "retrieval_ms": round(retrieval_ms, 1)
+    }
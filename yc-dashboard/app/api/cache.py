@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from app.db_logic import DATA_VERSION_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# how long a version check is trusted; NOTIFY from a finished run invalidates sooner
+VERSION_TTL_S = 5
+MAX_ENTRIES = 2000
+
+
+class ResponseCache:
+    """
+    Cache for read-only JSON endpoints, keyed by route + params + data version.
+    The data version is the latest completed scrape_runs.id plus a counter
+    bumped by every data_version NOTIFY (scrape or enrichment run finished).
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()    # key -> (version, etag, body)
+        self.run_id = None
+        self.bumps = 0
+        self.checked_at = 0.0
+        self.listener = None
+        self.lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self):
+        return f"{self.run_id}.{self.bumps}"
+
+    def invalidate(self, *args):
+        # signature fits asyncpg's listener callback
+        self.bumps += 1
+        self.checked_at = 0.0
+        self.entries.clear()
+        logger.info(f"response cache invalidated -> version {self.version}")
+
+    async def _listen(self, pool):
+        self.listener = await pool.acquire()
+        await self.listener.add_listener(DATA_VERSION_CHANNEL, self.invalidate)
+
+    async def current_version(self, pool):
+        """The single cheap check: MAX(id) over completed runs, at most every VERSION_TTL_S."""
+        if time.monotonic() - self.checked_at < VERSION_TTL_S:
+            return self.version
+        async with self.lock:
+            if time.monotonic() - self.checked_at < VERSION_TTL_S:
+                return self.version
+            if self.listener is None:
+                await self._listen(pool)
+            run_id = await pool.fetchval("""
+                SELECT COALESCE(MAX(id), 0) FROM scrape_runs
+                WHERE ended_at IS NOT NULL OR status = 'success'
+            """)
+            if run_id != self.run_id:
+                if self.run_id is not None:
+                    self.entries.clear()
+                self.run_id = run_id
+            self.checked_at = time.monotonic()
+        return self.version
+
+    async def respond(self, request: Request, pool, compute):
+        """
+        Serve `await compute()` as JSON, from cache when the version hasn't moved.
+        Answers If-None-Match with 304 and no body.
+        """
+        version = await self.current_version(pool)
+        key = request.url.path + "?" + "&".join(
+            f"{k}={v}" for k, v in sorted(request.query_params.multi_items())
+        )
+
+        entry = self.entries.get(key)
+        if entry and entry[0] == version:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            _, etag, body = entry
+        else:
+            self.misses += 1
+            body = json.dumps(jsonable_encoder(await compute())).encode("utf-8")
+            etag = '"' + hashlib.sha1(version.encode() + b":" + body).hexdigest()[:20] + '"'
+            self.entries[key] = (version, etag, body)
+            if len(self.entries) > MAX_ENTRIES:
+                self.entries.popitem(last=False)
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Data-Version": version}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def close(self, pool):
+        if self.listener is not None:
+            await self.listener.remove_listener(DATA_VERSION_CHANNEL, self.invalidate)
+            await pool.release(self.listener)
+            self.listener = None
+
+
+response_cache = ResponseCache()
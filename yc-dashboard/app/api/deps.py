@@ -0,0 +1,28 @@
+from fastapi import HTTPException
+import os
+
+from app.db_logic import get_db_pool
+
+# one pool per API process, created on first use
+_pool = None
+
+
+async def get_pool():
+    global _pool
+    if _pool is None:
+        db_url = os.getenv("DB_URL")
+        if not db_url:
+            raise HTTPException(status_code=500, detail="DB_URL not set")
+        _pool = await get_db_pool(db_url, name="yc-api")
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def current_pool():
+    return _pool
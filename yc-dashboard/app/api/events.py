@@ -0,0 +1,105 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import asyncpg
+import logging
+import os
+
+from app.db_logic import NOTIFY_CHANNEL
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_S = 15
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class ChangeBroadcaster:
+    """
+    One LISTEN connection per API process, fanned out to every SSE client.
+    Started by the first subscriber, closed on app shutdown.
+    """
+
+    def __init__(self):
+        self.conn = None
+        self.subscribers = set()
+        self.lock = asyncio.Lock()
+
+    async def _ensure_listening(self):
+        async with self.lock:
+            if self.conn is not None and not self.conn.is_closed():
+                return
+            db_url = os.getenv("DB_URL")
+            if not db_url:
+                raise HTTPException(status_code=500, detail="DB_URL not set")
+            self.conn = await asyncpg.connect(db_url)
+            self.conn.add_termination_listener(self._on_terminated)
+            await self.conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            logger.info(f"listening on {NOTIFY_CHANNEL}")
+
+    def _on_terminated(self, conn):
+        # postgres restart / network drop: forget it, the next keepalive reconnects
+        if self.conn is conn:
+            logger.warning(f"LISTEN connection on {NOTIFY_CHANNEL} lost")
+            self.conn = None
+
+    async def check(self):
+        """Called from the keepalive loop so a dropped LISTEN doesn't wait for a new client."""
+        try:
+            await self._ensure_listening()
+        except Exception as e:
+            logger.error(f"re-LISTEN on {NOTIFY_CHANNEL} failed: {e}")
+
+    def _on_notify(self, conn, pid, channel, payload):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # slow client, it can re-query on reconnect
+                pass
+
+    async def subscribe(self):
+        await self._ensure_listening()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def close(self):
+        if self.conn is not None and not self.conn.is_closed():
+            await self.conn.close()
+        self.conn = None
+
+
+broadcaster = ChangeBroadcaster()
+
+
+@router.get("/events/changes")
+async def change_events(request: Request):
+    """Server-sent events: one `changes` event per batch of detected company changes."""
+
+    queue = await broadcaster.subscribe()
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_S)
+                    yield f"event: changes\ndata: {payload}\n\n"
+                except asyncio.TimeoutError:
+                    await broadcaster.check()
+                    # comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
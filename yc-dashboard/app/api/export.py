@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+
+from app.api.deps import get_pool
+from app.export import stream_export, CONTENT_TYPES, DEFAULT_CHUNK_SIZE, require_pyarrow
+
+router = APIRouter()
+
+
+@router.get("/export/companies")
+async def export_companies(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=100, le=50000),
+):
+    """Full dataset in one streamed response, constant memory on the server."""
+
+    if format == "parquet":
+        try:
+            require_pyarrow()
+        except RuntimeError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+
+    pool = await get_pool()
+    filename = f"companies-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+
+    return StreamingResponse(
+        stream_export(pool, format, chunk_size),
+        media_type=CONTENT_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from datetime import date, datetime
+
+from app.api.deps import get_pool
+from app.api.cache import response_cache
+from app.snapshot_store import snapshot_as_of
+
+router = APIRouter()
+
+
+@router.get("/companies/{company_id}/as-of")
+async def company_as_of(
+    request: Request,
+    company_id: int,
+    at: str = Query(..., description="ISO date (end of that day) or datetime"),
+):
+    """The company's snapshot at a point in time, from hot storage or the Parquet archive."""
+    try:
+        as_of = date.fromisoformat(at) if len(at) == 10 else datetime.fromisoformat(at)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="at must be an ISO date or datetime")
+
+    pool = await get_pool()
+
+    async def compute():
+        async with pool.acquire() as conn:
+            snapshot = await snapshot_as_of(conn, company_id, as_of)
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="No snapshot at or before that time")
+        return {"company_id": company_id, "at": at, "snapshot": snapshot}
+
+    return await response_cache.respond(request, pool, compute)
@@ -8,6 +8,15 @@ load_dotenv(".env")
 load_dotenv(".env.local")
 
 from app.api.ai_explain import router as ai_router
+from app.api.similar import router as similar_router
+from app.api.events import router as events_router, broadcaster
+from app.api.export import router as export_router
+from app.api.search import router as search_router
+from app.api.history import router as history_router
+from app.api.metrics import router as metrics_router
+from app.api.cache import response_cache
+from app.api.deps import close_pool, current_pool, get_pool
+from app.db_logic import ensure_latest_table
 
 print("AI KEY LOADED:", bool(os.getenv("OPENAI_API_KEY")))
 
@@ -23,3 +32,27 @@ app.add_middleware(
 )
 
 app.include_router(ai_router, prefix="/api")
+app.include_router(similar_router, prefix="/api")
+app.include_router(events_router, prefix="/api")
+app.include_router(export_router, prefix="/api")
+app.include_router(search_router, prefix="/api")
+app.include_router(history_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
+
+
+@app.on_event("startup")
+async def startup():
+    # read models (company_latest, tags) once here, not on the first request
+    if not os.getenv("DB_URL"):
+        return
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        await ensure_latest_table(conn)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await broadcaster.close()
+    if current_pool() is not None:
+        await response_cache.close(current_pool())
+    await close_pool()
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from app.api.deps import get_pool
+
+router = APIRouter()
+
+
+@router.get("/db/pool")
+async def pool_metrics():
+    """Acquire waits, connections in use and per-query latency for this API process."""
+    pool = await get_pool()
+    return pool.metrics()
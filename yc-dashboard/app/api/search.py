@@ -0,0 +1,111 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+import base64
+import json
+
+from app.api.deps import get_pool
+from app.api.cache import response_cache
+
+router = APIRouter()
+
+# sort -> SQL expression used both for ORDER BY and for the keyset comparison
+SORT_KEYS = {
+    "relevance": "h.rank",
+    "momentum": "h.momentum_key",
+}
+
+
+def escape_like(value):
+    """User text as a literal inside LIKE: % _ and \\ lose their meaning."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def encode_cursor(sort, key, company_id):
+    raw = json.dumps([sort, key, company_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, key, company_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort")
+    return float(key), int(company_id)
+
+
+@router.get("/search")
+async def search(
+    request: Request,
+    q: Optional[str] = None,
+    batch: Optional[str] = None,
+    stage: Optional[str] = None,
+    location: Optional[str] = None,
+    tag: Optional[str] = None,
+    sort: str = Query("relevance", pattern="^(relevance|momentum)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """
+    Full-text search + filters on each company's *current* snapshot (company_latest),
+    paged by a keyset cursor of (sort key, id). Page 500 costs the same as page 1.
+    """
+    after_key, after_id = decode_cursor(cursor, sort) if cursor else (None, None)
+    pool = await get_pool()
+
+    async def compute():
+        async with pool.acquire() as conn:
+            # tag filter is an integer lookup on company_tags
+            tag_id = await conn.fetchval("SELECT id FROM tags WHERE name = $1", tag) if tag else None
+            if tag and tag_id is None:
+                return {"limit": limit, "sort": sort, "results": [], "next_cursor": None}
+
+            rows = await conn.fetch(f"""
+                SELECT * FROM (
+                    SELECT
+                        c.id, c.name, c.domain, c.is_active,
+                        l.batch, l.stage, l.location, l.tags,
+                        cs.momentum_score, cs.stability_score,
+                        CASE WHEN $1::text IS NULL THEN 0::float8
+                             ELSE ts_rank(c.search_vector, plainto_tsquery('english', $1))::float8
+                        END AS rank,
+                        COALESCE(cs.momentum_score, -1)::float8 AS momentum_key
+                    FROM company_latest l
+                    JOIN companies c ON c.id = l.company_id
+                    LEFT JOIN company_scores cs ON cs.company_id = c.id
+                    WHERE ($1::text IS NULL OR c.search_vector @@ plainto_tsquery('english', $1))
+                      AND ($2::text IS NULL OR l.batch = $2)
+                      AND ($3::text IS NULL OR l.stage = $3)
+                      AND ($4::text IS NULL OR l.location ILIKE '%' || $4 || '%' ESCAPE '\\')
+                      AND ($5::int IS NULL OR EXISTS (
+                          SELECT 1 FROM company_tags ct
+                          WHERE ct.company_id = l.company_id AND ct.tag_id = $5
+                      ))
+                ) h
+                WHERE $6::float8 IS NULL
+                   OR {SORT_KEYS[sort]} < $6
+                   OR ({SORT_KEYS[sort]} = $6 AND h.id < $7)
+                ORDER BY {SORT_KEYS[sort]} DESC, h.id DESC
+                LIMIT $8
+            """, q or None, batch, stage, escape_like(location) if location else None, tag_id, after_key, after_id, limit + 1)
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            key = last["rank"] if sort == "relevance" else last["momentum_key"]
+            next_cursor = encode_cursor(sort, key, last["id"])
+
+        results = []
+        for r in page:
+            item = dict(r)
+            item.pop("momentum_key")
+            if isinstance(item["tags"], str):
+                item["tags"] = json.loads(item["tags"])
+            results.append(item)
+
+        return {"limit": limit, "sort": sort, "results": results, "next_cursor": next_cursor}
+
+    return await response_cache.respond(request, pool, compute)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+import time
+
+from app.similarity import SimilarityIndex
+from app.api.deps import get_pool
+from app.api.cache import response_cache
+
+router = APIRouter()
+
+# one index per API process, built on first request
+index = SimilarityIndex()
+
+
+@router.get("/companies/{company_id}/similar")
+async def similar_companies(request: Request, company_id: int, k: int = Query(10, ge=1, le=100)):
+
+    pool = await get_pool()
+
+    async def compute():
+        await index.ensure_fresh(pool)
+
+        t0 = time.perf_counter()
+        results = index.top_k(company_id, k)
+        took_ms = (time.perf_counter() - t0) * 1000
+
+        if results is None:
+            raise HTTPException(status_code=404, detail="Company not found")
+
+        return {
+            "company_id": company_id,
+            "results": results,
+            "took_ms": round(took_ms, 3)
+        }
+
+    return await response_cache.respond(request, pool, compute)
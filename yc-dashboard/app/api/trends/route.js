@@ -9,26 +9,15 @@ export async function GET() {
   try {
     // ---------------------------
     // 1️⃣ Fastest Growing Tags
-    // (from latest snapshot only)
+    // (company_tags = current tags only)
     // ---------------------------
     const tagsRes = await pool.query(`
       SELECT
-        tag,
+        t.name AS tag,
         COUNT(*)::int AS occurrences
-      FROM (
-        SELECT
-          jsonb_array_elements_text(s.tags) AS tag
-        FROM company_snapshots s
-        INNER JOIN (
-          SELECT company_id, MAX(scraped_at) AS max_date
-          FROM company_snapshots
-          GROUP BY company_id
-        ) latest
-        ON s.company_id = latest.company_id
-        AND s.scraped_at = latest.max_date
-        WHERE s.tags IS NOT NULL
-      ) t
-      GROUP BY tag
+      FROM company_tags ct
+      JOIN tags t ON t.id = ct.tag_id
+      GROUP BY t.id, t.name
       ORDER BY occurrences DESC
       LIMIT 10;
     `);
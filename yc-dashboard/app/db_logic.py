@@ -1,10 +1,13 @@
 import hashlib
+import re
 import json
-import asyncpg
+import asyncio
 import logging
 from datetime import datetime
 
-from app.ai_intelligence import generate_company_explanation
+from app.ai_intelligence import generate_company_summaries, MODEL
+from app.snapshot_store import ensure_partitions
+from app.db_pool import create_pool
 
 # logging
 logging.basicConfig(level=logging.INFO)
@@ -14,8 +17,9 @@ logger = logging.getLogger(__name__)
 # -----------------------------
 # DB Pool
 # -----------------------------
-async def get_db_pool(db_url):
-    return await asyncpg.create_pool(db_url)
+async def get_db_pool(db_url, **overrides):
+    """Sized, timed and instrumented pool; see app/db_pool.py for the knobs."""
+    return await create_pool(db_url, **overrides)
 
 
 # -----------------------------
@@ -27,6 +31,57 @@ def compute_hash(data: dict) -> str:
     ).hexdigest()
 
 
+def normalize_company(hit: dict) -> dict:
+    """Map a raw directory record (Algolia hit) to the shape process_company_record expects."""
+    return {
+        'yc_company_id': hit.get('slug') or str(hit.get('objectID')),
+        'name': hit.get('name'),
+        'domain': hit.get('website'),
+        'batch': hit.get('batch'),
+        'stage': hit.get('status'),
+        'description': hit.get('one_liner'),
+        'location': hit.get('location'),
+        'tags': hit.get('tags', []),
+        'employee_range': str(hit.get('team_size')) if hit.get('team_size') else None
+    }
+
+
+# fields a directory *card* (v6 DOM mode) can't see
+CARD_MISSING_FIELDS = ("domain", "batch", "stage", "tags", "employee_range")
+
+
+async def fill_from_latest(pool, records):
+    """
+    Partial records (DOM cards) -> complete ones, taking CARD_MISSING_FIELDS
+    from what we already store for that company. Without this every known
+    company would hash as changed and get bogus STAGE/TAG changes to NULL / [].
+    Companies we don't know yet are returned as they are.
+    """
+    rows = await pool.fetch("""
+        SELECT c.yc_company_id, c.domain, s.batch, s.stage, s.tags::text AS tags, s.employee_range
+        FROM companies c
+        JOIN company_latest l ON l.company_id = c.id
+        JOIN company_snapshots s ON s.id = l.snapshot_id AND s.scraped_at = l.scraped_at
+        WHERE c.yc_company_id = ANY($1::text[])
+    """, [r["yc_company_id"] for r in records])
+    stored = {r["yc_company_id"]: r for r in rows}
+
+    filled = []
+    for rec in records:
+        prev = stored.get(rec["yc_company_id"])
+        if prev is None:
+            filled.append(rec)
+            continue
+        rec = dict(rec)
+        for field in CARD_MISSING_FIELDS:
+            if field == "tags":
+                rec["tags"] = json.loads(prev["tags"]) if prev["tags"] else []
+            else:
+                rec[field] = prev[field]
+        filled.append(rec)
+    return filled
+
+
 def detect_changes(old, new):
     changes = []
 
@@ -36,7 +91,8 @@ def detect_changes(old, new):
     if old["location"] != new["location"]:
         changes.append(("LOCATION_CHANGE", old["location"], new["location"]))
 
-    if set(old["tags"]) != set(new["tags"]):
+    # tag ids are interned ints, so this is a plain set compare
+    if old["tag_ids"] != new["tag_ids"]:
         changes.append(("TAG_CHANGE", json.dumps(old["tags"]), json.dumps(new["tags"])))
 
     if old["description"] != new["description"]:
@@ -45,6 +101,40 @@ def detect_changes(old, new):
     return changes
 
 
+# payloads are capped at 8000 bytes by Postgres, ids beyond this are only counted
+NOTIFY_CHANNEL = "company_changes"
+NOTIFY_MAX_IDS = 200
+
+
+async def notify_changes(conn, change_rows):
+    """
+    One lightweight NOTIFY per batch of (company_id, change_type, ...) rows.
+    Sent inside the caller's transaction, so listeners only hear about committed changes.
+    """
+    if not change_rows:
+        return
+    company_ids = list(dict.fromkeys(r[0] for r in change_rows))
+    types = {}
+    for r in change_rows:
+        types[r[1]] = types.get(r[1], 0) + 1
+    payload = json.dumps({
+        "count": len(change_rows),
+        "companies": company_ids[:NOTIFY_MAX_IDS],
+        "company_count": len(company_ids),
+        "types": types,
+        "at": datetime.utcnow().isoformat(timespec="seconds"),
+    })
+    await conn.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, payload)
+
+
+# API response caches listen here; payload is just who finished ("scrape:12", "enrichment")
+DATA_VERSION_CHANNEL = "data_version"
+
+
+async def notify_data_version(conn, source):
+    await conn.execute("SELECT pg_notify($1, $2)", DATA_VERSION_CHANNEL, str(source))
+
+
 def compute_scores(change_count, days_since_last_change):
     momentum = change_count * 2
     stability = max(0, 100 - days_since_last_change)
@@ -61,26 +151,31 @@ async def update_search_vector(conn, company_id):
             setweight(to_tsvector('english', coalesce(c.name, '')), 'A') ||
             setweight(to_tsvector('english', coalesce(s.description, '')), 'B') ||
             setweight(to_tsvector('english', coalesce(s.tags::text, '')), 'C')
-        FROM company_snapshots s
-        WHERE s.company_id = c.id
-          AND s.company_id = $1
-          AND s.scraped_at = (
-              SELECT MAX(scraped_at)
-              FROM company_snapshots
-              WHERE company_id = $1
-          );
+        FROM company_latest l
+        JOIN company_snapshots s ON s.id = l.snapshot_id AND s.scraped_at = l.scraped_at
+        WHERE l.company_id = $1
+          AND c.id = l.company_id;
     """, company_id)
 
 
 # -----------------------------
 # Core Logic
 # -----------------------------
-async def process_company_record(pool, company_data):
+async def process_company_record(pool, company_data, summaries=None, changes_out=None):
+    """
+    Upsert one company. If `summaries` is a list, every new snapshot is
+    appended to it for generate_summaries() to handle in batches.
+    If `changes_out` is a list, detected change rows go there and the caller
+    sends one notify_changes() for the lot; otherwise we NOTIFY per company.
+    """
 
     current_hash = compute_hash(company_data)
     yc_slug = company_data["yc_company_id"]
 
     async with pool.acquire() as conn:
+        tag_ids = await intern_tags(conn, company_data.get("tags") or [])
+        new_tag_ids = frozenset(tag_ids[t] for t in company_data.get("tags") or [])
+
         async with conn.transaction():
 
             row = await conn.fetchrow(
@@ -110,22 +205,8 @@ async def process_company_record(pool, company_data):
                     VALUES ($1, 0, 100)
                 """, company_id)
 
-                insight = generate_company_explanation(
-                    company=company_data,
-                    changes=[],
-                    scores={"momentum": 0, "stability": 100}
-                )
-
-                if insight is None:
-                    insight = "AI summary not available."
-
-
-                #  SAFE AI INSERT
-                    await conn.execute("""
-                        INSERT INTO company_ai_insights
-                        (company_id, insight_type, content, model_name, snapshot_id)
-                        VALUES ($1, 'SUMMARY', $2, 'disabled', $3)
-                    """, company_id, insight, "openai" if insight != "AI summary not available." else "disabled" , snapshot_id)
+                if summaries is not None:
+                    summaries.append((company_id, snapshot_id, company_data, []))
 
                 return "new"
 
@@ -140,12 +221,12 @@ async def process_company_record(pool, company_data):
                     company_id
                 )
 
+            # company_latest points straight at the newest snapshot (and its partition)
             last_snapshot = await conn.fetchrow("""
-                SELECT id, stage, location, description, tags, scraped_at, data_hash
-                FROM company_snapshots
-                WHERE company_id = $1
-                ORDER BY scraped_at DESC
-                LIMIT 1
+                SELECT s.id, s.stage, s.location, s.description, s.scraped_at, s.data_hash
+                FROM company_latest l
+                JOIN company_snapshots s ON s.id = l.snapshot_id AND s.scraped_at = l.scraped_at
+                WHERE l.company_id = $1
             """, company_id)
 
             # =============================
@@ -164,18 +245,8 @@ async def process_company_record(pool, company_data):
                     ON CONFLICT (company_id) DO NOTHING
                 """, company_id)
 
-                insight = generate_company_explanation(
-                    company=company_data,
-                    changes=[],
-                    scores={"momentum": 0, "stability": 100}
-                )
-
-                if insight:
-                    await conn.execute("""
-                        INSERT INTO company_ai_insights
-                        (company_id, insight_type, content, model_name, snapshot_id)
-                        VALUES ($1, 'SUMMARY', $2, 'disabled', $3)
-                    """, company_id, insight, snapshot_id)
+                if summaries is not None:
+                    summaries.append((company_id, snapshot_id, company_data, []))
 
                 await conn.execute(
                     "UPDATE companies SET last_seen_at = NOW() WHERE id = $1",
@@ -197,6 +268,10 @@ async def process_company_record(pool, company_data):
             # =============================
             # CHANGE DETECTED
             # =============================
+            # read before the insert: the snapshot trigger moves company_tags to the new list
+            old_tags = await current_tags(conn, [company_id])
+            old_tag_ids, old_tag_names = old_tags.get(company_id, NO_TAGS)
+
             snapshot_id = await insert_snapshot(
                 conn, company_id, company_data, current_hash
             )
@@ -207,10 +282,11 @@ async def process_company_record(pool, company_data):
                 "stage": last_snapshot["stage"],
                 "location": last_snapshot["location"],
                 "description": last_snapshot["description"],
-                "tags": json.loads(last_snapshot["tags"]),
+                "tags": old_tag_names,
+                "tag_ids": old_tag_ids,
             }
 
-            changes = detect_changes(old_data, company_data)
+            changes = detect_changes(old_data, {**company_data, "tag_ids": new_tag_ids})
 
             for ctype, old, new in changes:
                 await conn.execute("""
@@ -219,6 +295,11 @@ async def process_company_record(pool, company_data):
                     VALUES ($1, $2, $3, $4, NOW())
                 """, company_id, ctype, old, new)
 
+            change_rows = [(company_id, ctype) for ctype, _, _ in changes]
+            # NOTIFY is transactional; the caller's list is handed rows only after COMMIT
+            if changes_out is None:
+                await notify_changes(conn, change_rows)
+
             days_since = (datetime.utcnow() - last_snapshot["scraped_at"]).days
             momentum, stability = compute_scores(len(changes), days_since)
 
@@ -233,32 +314,368 @@ async def process_company_record(pool, company_data):
                     last_computed_at = NOW()
             """, company_id, momentum, stability)
 
-            insight = generate_company_explanation(
-                company=company_data,
-                changes=changes,
-                scores={"momentum": momentum, "stability": stability}
-            )
-
-            if insight:
-                await conn.execute("""
-                    INSERT INTO company_ai_insights
-                    (company_id, insight_type, content, model_name, snapshot_id)
-                    VALUES ($1, 'SUMMARY', $2, 'disabled', $3)
-                """, company_id, insight, snapshot_id)
+            if summaries is not None:
+                summaries.append((company_id, snapshot_id, company_data, changes))
 
             await conn.execute(
                 "UPDATE companies SET last_seen_at = NOW() WHERE id = $1",
                 company_id
             )
 
-            return "updated"
+        # transaction committed
+        if changes_out is not None:
+            changes_out.extend(change_rows)
+        return "updated"
+
+
+# -----------------------------
+# Batched Ingestion
+# -----------------------------
+async def process_company_batch(pool, records, summaries=None):
+    """
+    Same rules as process_company_record, but N records in one transaction
+    using multi-row statements (unnest) instead of ~6 round trips per company.
+    New snapshots are appended to `summaries` the same way.
+    Returns {"new": n, "updated": n, "unchanged": n}.
+    """
+    # last one wins if the same company shows up twice in a batch
+    by_slug = {r["yc_company_id"]: r for r in records}
+    slugs = list(by_slug)
+    hashes = {slug: compute_hash(rec) for slug, rec in by_slug.items()}
+    result = {"new": 0, "updated": 0, "unchanged": 0}
+
+    if not slugs:
+        return result
+
+    async with pool.acquire() as conn:
+        tag_ids = await intern_tags(conn, [t for rec in by_slug.values() for t in rec.get("tags") or []])
+        new_tags = {
+            slug: frozenset(tag_ids[t] for t in rec.get("tags") or []) for slug, rec in by_slug.items()
+        }
+
+        async with conn.transaction():
+
+            rows = await conn.fetch(
+                "SELECT id, yc_company_id FROM companies WHERE yc_company_id = ANY($1::text[])",
+                slugs
+            )
+            ids = {r["yc_company_id"]: r["id"] for r in rows}
+            new_slugs = [slug for slug in slugs if slug not in ids]
+
+            # =============================
+            # NEW COMPANIES
+            # =============================
+            new_ids = {}
+            if new_slugs:
+                inserted = await conn.fetch("""
+                    INSERT INTO companies
+                    (yc_company_id, name, domain, first_seen_at, last_seen_at, is_active)
+                    SELECT slug, name, domain, NOW(), NOW(), TRUE
+                    FROM unnest($1::text[], $2::text[], $3::text[]) AS t(slug, name, domain)
+                    RETURNING id, yc_company_id
+                """,
+                new_slugs,
+                [by_slug[slug]["name"] for slug in new_slugs],
+                [by_slug[slug]["domain"] for slug in new_slugs])
+                new_ids = {r["yc_company_id"]: r["id"] for r in inserted}
+
+            # =============================
+            # EXISTING COMPANIES
+            # =============================
+            existing_ids = list(ids.values())
+            last_by_id = {}
+            old_tags = {}
+            if existing_ids:
+                # seen again -> last_seen_at, and reactivate if it had disappeared
+                await conn.execute("""
+                    UPDATE companies SET last_seen_at = NOW(), is_active = TRUE
+                    WHERE id = ANY($1::int[])
+                """, existing_ids)
+
+                last = await conn.fetch("""
+                    SELECT s.company_id, s.stage, s.location, s.description, s.scraped_at, s.data_hash
+                    FROM company_latest l
+                    JOIN company_snapshots s ON s.id = l.snapshot_id AND s.scraped_at = l.scraped_at
+                    WHERE l.company_id = ANY($1::int[])
+                """, existing_ids)
+                last_by_id = {r["company_id"]: r for r in last}
+                old_tags = await current_tags(conn, existing_ids)
+
+            snapshot_rows = []   # (company_id, record, hash, changes)
+            fresh_scores = []    # company ids that get the default 0 / 100
+            score_updates = []   # (company_id, momentum, stability)
+            change_rows = []     # (company_id, change_type, old, new)
+
+            for slug in new_slugs:
+                snapshot_rows.append((new_ids[slug], by_slug[slug], hashes[slug], []))
+                fresh_scores.append(new_ids[slug])
+                result["new"] += 1
+
+            for slug, company_id in ids.items():
+                record = by_slug[slug]
+                prev = last_by_id.get(company_id)
+                old_tag_ids, old_tag_names = old_tags.get(company_id, NO_TAGS)
+
+                # BASELINE SNAPSHOT
+                if prev is None:
+                    snapshot_rows.append((company_id, record, hashes[slug], []))
+                    fresh_scores.append(company_id)
+                    result["updated"] += 1
+                    continue
+
+                # NO CHANGE
+                if prev["data_hash"] == hashes[slug]:
+                    result["unchanged"] += 1
+                    continue
+
+                # CHANGE DETECTED
+                old_data = {
+                    "stage": prev["stage"],
+                    "location": prev["location"],
+                    "description": prev["description"],
+                    "tags": old_tag_names,
+                    "tag_ids": old_tag_ids,
+                }
+                changes = detect_changes(old_data, {**record, "tag_ids": new_tags[slug]})
+                change_rows.extend((company_id, ctype, old, new) for ctype, old, new in changes)
+
+                days_since = (datetime.utcnow() - prev["scraped_at"]).days
+                momentum, stability = compute_scores(len(changes), days_since)
+                score_updates.append((company_id, momentum, stability))
+
+                snapshot_rows.append((company_id, record, hashes[slug], changes))
+                result["updated"] += 1
+
+            # =============================
+            # MULTI-ROW WRITES
+            # =============================
+            if snapshot_rows:
+                inserted_snapshots = await conn.fetch("""
+                    INSERT INTO company_snapshots
+                    (company_id, batch, stage, description, location, tags,
+                     employee_range, scraped_at, data_hash)
+                    SELECT company_id, batch, stage, description, location, tags::jsonb,
+                           employee_range, NOW(), data_hash
+                    FROM unnest($1::int[], $2::text[], $3::text[], $4::text[], $5::text[],
+                                $6::text[], $7::text[], $8::text[])
+                         AS t(company_id, batch, stage, description, location,
+                              tags, employee_range, data_hash)
+                    RETURNING id, company_id
+                """,
+                [r[0] for r in snapshot_rows],
+                [r[1]["batch"] for r in snapshot_rows],
+                [r[1]["stage"] for r in snapshot_rows],
+                [r[1]["description"] for r in snapshot_rows],
+                [r[1]["location"] for r in snapshot_rows],
+                [json.dumps(r[1]["tags"]) for r in snapshot_rows],
+                [r[1]["employee_range"] for r in snapshot_rows],
+                [r[2] for r in snapshot_rows])
+
+                # INSERT ... SELECT FROM unnest doesn't promise RETURNING comes back in input
+                # order, so match by company_id (one snapshot per company per batch).
+                # summaries + company_latest both hang off this mapping
+                snapshot_of = {r["company_id"]: r["id"] for r in inserted_snapshots}
+                if len(snapshot_of) != len(snapshot_rows):
+                    raise RuntimeError(
+                        f"snapshot insert returned {len(snapshot_of)} ids for {len(snapshot_rows)} companies"
+                    )
+                # company_latest + company_tags follow via the snapshot trigger
+                snapshot_ids = list(snapshot_of.values())
+
+                if summaries is not None:
+                    summaries.extend(
+                        (r[0], snapshot_of[r[0]], r[1], r[3]) for r in snapshot_rows
+                    )
+
+                # new snapshot == latest snapshot, so build the vectors straight from it
+                await conn.execute("""
+                    UPDATE companies c
+                    SET search_vector =
+                        setweight(to_tsvector('english', coalesce(c.name, '')), 'A') ||
+                        setweight(to_tsvector('english', coalesce(s.description, '')), 'B') ||
+                        setweight(to_tsvector('english', coalesce(s.tags::text, '')), 'C')
+                    FROM company_snapshots s
+                    WHERE s.id = ANY($1::int[])
+                      AND c.id = s.company_id
+                """, snapshot_ids)
+
+            if change_rows:
+                await conn.execute("""
+                    INSERT INTO company_changes
+                    (company_id, change_type, old_value, new_value, detected_at)
+                    SELECT company_id, change_type, old_value, new_value, NOW()
+                    FROM unnest($1::int[], $2::text[], $3::text[], $4::text[])
+                         AS t(company_id, change_type, old_value, new_value)
+                """,
+                [r[0] for r in change_rows],
+                [r[1] for r in change_rows],
+                [r[2] for r in change_rows],
+                [r[3] for r in change_rows])
+
+                await notify_changes(conn, change_rows)
+
+            if fresh_scores:
+                await conn.execute("""
+                    INSERT INTO company_scores (company_id, momentum_score, stability_score)
+                    SELECT unnest($1::int[]), 0, 100
+                    ON CONFLICT (company_id) DO NOTHING
+                """, fresh_scores)
+
+            if score_updates:
+                await conn.execute("""
+                    INSERT INTO company_scores
+                    (company_id, momentum_score, stability_score, last_computed_at)
+                    SELECT company_id, momentum, stability, NOW()
+                    FROM unnest($1::int[], $2::numeric[], $3::numeric[])
+                         AS t(company_id, momentum, stability)
+                    ON CONFLICT (company_id)
+                    DO UPDATE SET
+                        momentum_score = EXCLUDED.momentum_score,
+                        stability_score = EXCLUDED.stability_score,
+                        last_computed_at = NOW()
+                """,
+                [r[0] for r in score_updates],
+                [r[1] for r in score_updates],
+                [r[2] for r in score_updates])
+
+    return result
+
+
+# -----------------------------
+# AI Summaries (batched)
+# -----------------------------
+SUMMARY_BATCH_SIZE = 10
+_insights_ready = False
+
+
+def summary_fingerprint(data: dict) -> str:
+    """
+    Hash of only what the summary is written from. Whitespace in the
+    description or a tag reorder must not trigger a new LLM call.
+    """
+    description = re.sub(r"\s+", " ", data.get("description") or "").strip().lower()
+    tags = sorted({t.strip().lower() for t in (data.get("tags") or [])})
+    return compute_hash({
+        "name": data.get("name"),
+        "stage": data.get("stage"),
+        "description": description,
+        "tags": tags,
+    })
+
+
+async def ensure_insight_columns(conn):
+    global _insights_ready
+    if _insights_ready:
+        return
+    await conn.execute("""
+        ALTER TABLE company_ai_insights ADD COLUMN IF NOT EXISTS source_hash TEXT
+    """)
+    _insights_ready = True
+
+
+async def generate_summaries(pool, pending):
+    """
+    pending: [(company_id, snapshot_id, company_data, changes)] collected
+    during ingestion. Skips companies whose latest SUMMARY was written from
+    the same fingerprint, packs the rest SUMMARY_BATCH_SIZE per prompt.
+    Returns {"generated": n, "skipped": n, "llm_calls": n}.
+    """
+    stats = {"generated": 0, "skipped": 0, "llm_calls": 0}
+    if not pending:
+        return stats
+
+    # one entry per company, newest snapshot wins
+    latest = {}
+    for item in pending:
+        latest[item[0]] = item
+    fingerprints = {cid: summary_fingerprint(item[2]) for cid, item in latest.items()}
+
+    async with pool.acquire() as conn:
+        await ensure_insight_columns(conn)
+        rows = await conn.fetch("""
+            SELECT DISTINCT ON (company_id) company_id, source_hash
+            FROM company_ai_insights
+            WHERE insight_type = 'SUMMARY' AND company_id = ANY($1::int[])
+            ORDER BY company_id, generated_at DESC
+        """, list(latest))
+    existing = {r["company_id"]: r["source_hash"] for r in rows}
+
+    todo = [item for cid, item in latest.items() if existing.get(cid) != fingerprints[cid]]
+    stats["skipped"] = len(latest) - len(todo)
+
+    for i in range(0, len(todo), SUMMARY_BATCH_SIZE):
+        chunk = todo[i:i + SUMMARY_BATCH_SIZE]
+        prompt_items = [
+            {**data, "key": str(cid), "changes": changes}
+            for cid, _, data, changes in chunk
+        ]
+
+        # requests is blocking, keep it off the event loop
+        results = await asyncio.to_thread(generate_company_summaries, prompt_items)
+        stats["llm_calls"] += 1
+        if not results:
+            continue
+
+        rows = [
+            (cid, results[str(cid)], MODEL, snapshot_id, fingerprints[cid])
+            for cid, snapshot_id, _, _ in chunk
+            if results.get(str(cid))
+        ]
+        if not rows:
+            continue
+
+        async with pool.acquire() as conn:
+            await conn.executemany("""
+                INSERT INTO company_ai_insights
+                (company_id, insight_type, content, model_name, snapshot_id, source_hash)
+                VALUES ($1, 'SUMMARY', $2, $3, $4, $5)
+            """, rows)
+        stats["generated"] += len(rows)
+
+    logger.info(
+        f"summaries: {stats['generated']} generated, {stats['skipped']} unchanged, "
+        f"{stats['llm_calls']} LLM calls for {len(latest)} companies"
+    )
+    return stats
+
+
+async def pending_summaries_since(conn, since):
+    """
+    Rebuild generate_summaries() input for every snapshot written since `since`.
+    A resumed scrape uses it for the pages that were done before the interruption;
+    generate_summaries skips whatever already got a summary.
+    """
+    rows = await conn.fetch("""
+        SELECT s.company_id, s.id AS snapshot_id, c.name, s.batch, s.stage, s.description,
+               s.tags::text AS tags,
+               (SELECT json_agg(json_build_array(ch.change_type, ch.old_value, ch.new_value))::text
+                FROM company_changes ch
+                WHERE ch.company_id = s.company_id AND ch.detected_at = s.scraped_at) AS changes
+        FROM company_snapshots s
+        JOIN companies c ON c.id = s.company_id
+        WHERE s.scraped_at >= $1
+        ORDER BY s.scraped_at
+    """, since)
+
+    pending = []
+    for r in rows:
+        data = {
+            "name": r["name"],
+            "batch": r["batch"],
+            "stage": r["stage"],
+            "description": r["description"],
+            "tags": json.loads(r["tags"]) if r["tags"] else [],
+        }
+        changes = [tuple(c) for c in json.loads(r["changes"])] if r["changes"] else []
+        pending.append((r["company_id"], r["snapshot_id"], data, changes))
+    return pending
 
 
 # -----------------------------
 # Snapshot Insert
 # -----------------------------
 async def insert_snapshot(conn, company_id, data, data_hash):
-    return await conn.fetchval("""
+    snapshot_id = await conn.fetchval("""
         INSERT INTO company_snapshots
         (company_id, batch, stage, description, location, tags,
          employee_range, scraped_at, data_hash)
@@ -273,3 +690,236 @@ async def insert_snapshot(conn, company_id, data, data_hash):
     json.dumps(data["tags"]),
     data["employee_range"],
     data_hash)
+
+    return snapshot_id
+
+
+# -----------------------------
+# Latest Snapshot Table
+# -----------------------------
+# one row per company mirroring its newest snapshot's filterable fields,
+# so search filters hit current data through plain indexes
+LATEST_DDL = """
+    CREATE TABLE IF NOT EXISTS company_latest (
+        company_id   INT PRIMARY KEY REFERENCES companies(id) ON DELETE CASCADE,
+        snapshot_id  INT NOT NULL,
+        batch        TEXT,
+        stage        TEXT,
+        location     TEXT,
+        tags         JSONB,
+        scraped_at   TIMESTAMP NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_company_latest_batch ON company_latest (batch, company_id);
+    CREATE INDEX IF NOT EXISTS idx_company_latest_stage ON company_latest (stage, company_id);
+    -- location is a substring match and the momentum sort key comes through a
+    -- LEFT JOIN + COALESCE, no btree serves either; a few thousand rows sort fine
+    DROP INDEX IF EXISTS idx_company_latest_location;
+    DROP INDEX IF EXISTS idx_company_scores_momentum;
+
+    INSERT INTO company_latest (company_id, snapshot_id, batch, stage, location, tags, scraped_at)
+    SELECT DISTINCT ON (company_id)
+        company_id, id, batch, stage, location, tags, scraped_at
+    FROM company_snapshots
+    WHERE NOT EXISTS (SELECT 1 FROM company_latest)
+    ORDER BY company_id, scraped_at DESC
+    ON CONFLICT (company_id) DO NOTHING;
+"""
+_latest_ready = False
+
+
+async def ensure_latest_table(conn):
+    """
+    Create + backfill company_latest and the tag tables once per process.
+    Safe to call from every entry point.
+    """
+    global _latest_ready
+    if _latest_ready:
+        return
+    await conn.execute(LATEST_DDL)
+    # tags are backfilled from company_latest, so they go second
+    await conn.execute(TAGS_DDL)
+    await conn.execute(LATEST_TRIGGER_DDL)
+    # upcoming monthly snapshot partitions (no-op until snapshot_store migrate has run)
+    await ensure_partitions(conn)
+    _latest_ready = True
+
+
+# -----------------------------
+# Tag Dictionary
+# -----------------------------
+# every tag string is stored once in `tags`; company_tags holds each
+# company's CURRENT tag ids, kept in step by the snapshot trigger below
+TAGS_DDL = """
+    CREATE TABLE IF NOT EXISTS tags (
+        id    SERIAL PRIMARY KEY,
+        name  TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS company_tags (
+        company_id  INT REFERENCES companies(id) ON DELETE CASCADE,
+        tag_id      INT REFERENCES tags(id),
+        PRIMARY KEY (company_id, tag_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_company_tags_tag ON company_tags (tag_id, company_id);
+
+    -- first run only: fill both from the current snapshots
+    INSERT INTO tags (name)
+    SELECT DISTINCT jsonb_array_elements_text(tags)
+    FROM company_latest
+    WHERE jsonb_typeof(tags) = 'array'
+      AND NOT EXISTS (SELECT 1 FROM company_tags)
+    ON CONFLICT (name) DO NOTHING;
+
+    INSERT INTO company_tags (company_id, tag_id)
+    SELECT DISTINCT l.company_id, t.id
+    FROM company_latest l
+    CROSS JOIN LATERAL jsonb_array_elements_text(l.tags) AS e(name)
+    JOIN tags t ON t.name = e.name
+    WHERE jsonb_typeof(l.tags) = 'array'
+      AND NOT EXISTS (SELECT 1 FROM company_tags)
+    ON CONFLICT DO NOTHING;
+"""
+NO_TAGS = (frozenset(), [])
+
+# name -> id, only ever grows (tag rows are never deleted)
+_tag_ids = {}
+
+
+async def intern_tags(conn, names):
+    """
+    Make sure every name in `names` has a tag id and return the name -> id map.
+    Call it OUTSIDE the ingest transaction: ids get cached for the life of the
+    process, so they must not come from an insert that could still roll back.
+    """
+    missing = sorted({n for n in names if n not in _tag_ids})
+    if missing:
+        # sorted, so concurrent writers take the unique-index locks in the same order
+        await conn.execute("""
+            INSERT INTO tags (name)
+            SELECT unnest($1::text[])
+            ON CONFLICT (name) DO NOTHING
+        """, missing)
+        rows = await conn.fetch("SELECT id, name FROM tags WHERE name = ANY($1::text[])", missing)
+        _tag_ids.update({r["name"]: r["id"] for r in rows})
+    return _tag_ids
+
+
+async def current_tags(conn, company_ids):
+    """company_id -> (frozenset of tag ids, [tag names]) from company_tags."""
+    rows = await conn.fetch("""
+        SELECT ct.company_id,
+               array_agg(ct.tag_id ORDER BY t.name) AS tag_ids,
+               array_agg(t.name ORDER BY t.name) AS names
+        FROM company_tags ct
+        JOIN tags t ON t.id = ct.tag_id
+        WHERE ct.company_id = ANY($1::int[])
+        GROUP BY ct.company_id
+    """, company_ids)
+    return {r["company_id"]: (frozenset(r["tag_ids"]), list(r["names"])) for r in rows}
+
+
+# -----------------------------
+# Snapshot Trigger
+# -----------------------------
+# company_latest + company_tags are kept by a trigger on company_snapshots,
+# so every writer (v5's psycopg2 inserts included) keeps the read models current.
+# Older snapshots (backfills, restores) don't move the latest row.
+LATEST_TRIGGER_DDL = """
+    CREATE OR REPLACE FUNCTION company_latest_sync() RETURNS trigger AS $$
+    DECLARE
+        new_tags jsonb := CASE WHEN jsonb_typeof(NEW.tags) = 'array' THEN NEW.tags ELSE '[]'::jsonb END;
+    BEGIN
+        INSERT INTO company_latest AS l
+            (company_id, snapshot_id, batch, stage, location, tags, scraped_at)
+        VALUES (NEW.company_id, NEW.id, NEW.batch, NEW.stage, NEW.location, NEW.tags, NEW.scraped_at)
+        ON CONFLICT (company_id) DO UPDATE SET
+            snapshot_id = EXCLUDED.snapshot_id,
+            batch = EXCLUDED.batch,
+            stage = EXCLUDED.stage,
+            location = EXCLUDED.location,
+            tags = EXCLUDED.tags,
+            scraped_at = EXCLUDED.scraped_at
+        WHERE l.scraped_at <= EXCLUDED.scraped_at;
+        IF NOT FOUND THEN
+            RETURN NULL;
+        END IF;
+
+        -- ingestion interns tags up front, so this is normally a no-op
+        INSERT INTO tags (name)
+        SELECT DISTINCT e.name FROM jsonb_array_elements_text(new_tags) AS e(name)
+        ORDER BY e.name
+        ON CONFLICT (name) DO NOTHING;
+
+        DELETE FROM company_tags ct
+        WHERE ct.company_id = NEW.company_id
+          AND NOT EXISTS (
+              SELECT 1 FROM jsonb_array_elements_text(new_tags) AS e(name)
+              JOIN tags t ON t.name = e.name
+              WHERE t.id = ct.tag_id
+          );
+
+        INSERT INTO company_tags (company_id, tag_id)
+        SELECT DISTINCT NEW.company_id, t.id
+        FROM jsonb_array_elements_text(new_tags) AS e(name)
+        JOIN tags t ON t.name = e.name
+        ON CONFLICT DO NOTHING;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgrelid = 'company_snapshots'::regclass AND tgname = 'trg_company_latest'
+        ) THEN
+            RETURN;
+        END IF;
+
+        CREATE TRIGGER trg_company_latest
+            AFTER INSERT ON company_snapshots
+            FOR EACH ROW EXECUTE FUNCTION company_latest_sync();
+
+        -- first install: catch up on anything written around the old ingest path
+        INSERT INTO company_latest AS l
+            (company_id, snapshot_id, batch, stage, location, tags, scraped_at)
+        SELECT DISTINCT ON (company_id)
+            company_id, id, batch, stage, location, tags, scraped_at
+        FROM company_snapshots
+        ORDER BY company_id, scraped_at DESC
+        ON CONFLICT (company_id) DO UPDATE SET
+            snapshot_id = EXCLUDED.snapshot_id,
+            batch = EXCLUDED.batch,
+            stage = EXCLUDED.stage,
+            location = EXCLUDED.location,
+            tags = EXCLUDED.tags,
+            scraped_at = EXCLUDED.scraped_at
+        WHERE l.snapshot_id <> EXCLUDED.snapshot_id;
+
+        INSERT INTO tags (name)
+        SELECT DISTINCT jsonb_array_elements_text(tags)
+        FROM company_latest
+        WHERE jsonb_typeof(tags) = 'array'
+        ON CONFLICT (name) DO NOTHING;
+
+        DELETE FROM company_tags ct
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM company_latest l
+            CROSS JOIN LATERAL jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(l.tags) = 'array' THEN l.tags ELSE '[]'::jsonb END
+            ) AS e(name)
+            JOIN tags t ON t.name = e.name
+            WHERE l.company_id = ct.company_id AND t.id = ct.tag_id
+        );
+
+        INSERT INTO company_tags (company_id, tag_id)
+        SELECT DISTINCT l.company_id, t.id
+        FROM company_latest l
+        CROSS JOIN LATERAL jsonb_array_elements_text(l.tags) AS e(name)
+        JOIN tags t ON t.name = e.name
+        WHERE jsonb_typeof(l.tags) = 'array'
+        ON CONFLICT DO NOTHING;
+    END
+    $$;
+"""
@@ -0,0 +1,323 @@
+"""
+One asyncpg pool factory for every Python entry point (scrapers, enricher,
+API, CLIs). db_logic.get_db_pool() goes through here.
+
+Settings come from the environment, keyword arguments win:
+    DB_POOL_MIN / DB_POOL_MAX     connections (default 2 / 10)
+    DB_STATEMENT_TIMEOUT_MS       server-side statement_timeout (default 30000, 0 = off)
+    DB_STATEMENT_CACHE            prepared statements cached per connection (default 100)
+    DB_POOL_ADAPTIVE=1            move the in-use limit between min and max
+                                  based on observed acquire waits
+
+The returned InstrumentedPool is a drop-in for asyncpg.Pool and keeps
+acquire-wait, in-use and per-query latency numbers: pool.metrics().
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import deque
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SIZE = 2
+DEFAULT_MAX_SIZE = 10
+DEFAULT_STATEMENT_TIMEOUT_MS = 30000
+DEFAULT_STATEMENT_CACHE = 100
+
+# how many recent samples the percentiles are computed over
+WINDOW = 2000
+TOP_QUERIES = 5
+
+# adaptive sizing
+ADAPT_INTERVAL_S = 10
+TARGET_WAIT_MS = 20         # p95 acquire wait we are happy with
+# stop growing once queries get this much slower than the best we've seen:
+# past that point Postgres is the bottleneck and more connections only add contention
+MAX_QUERY_SLOWDOWN = 1.5
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _summary(samples):
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "max": None}
+    s = sorted(samples)
+    return {
+        "count": len(s),
+        "p50": round(s[len(s) // 2], 2),
+        "p95": round(s[min(len(s) - 1, int(0.95 * len(s)))], 2),
+        "max": round(s[-1], 2),
+    }
+
+
+class _AcquireContext:
+    """What pool.acquire() returns: works with both `async with` and `await`."""
+
+    def __init__(self, pool, timeout):
+        self.pool = pool
+        self.timeout = timeout
+        self.conn = None
+
+    def __await__(self):
+        return self.pool._acquire(self.timeout).__await__()
+
+    async def __aenter__(self):
+        self.conn = await self.pool._acquire(self.timeout)
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        conn, self.conn = self.conn, None
+        await self.pool.release(conn)
+
+
+class InstrumentedPool:
+    """
+    Wraps an asyncpg pool. Every acquire goes through a counting gate whose
+    limit can move at runtime, which is what makes resizing possible
+    (asyncpg can't change max_size after creation).
+    """
+
+    def __init__(self, pool, name, min_size, max_size, adaptive=False):
+        self._pool = pool
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.adaptive = adaptive
+        self.limit = min_size if adaptive else max_size
+
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_in_use = 0
+        self._cond = asyncio.Condition()
+
+        self.acquire_waits = deque(maxlen=WINDOW)
+        self.query_times = deque(maxlen=WINDOW)
+        self.queries = {}   # normalized SQL -> [count, total_ms, max_ms]
+        self.counters = {"acquired": 0, "acquire_timeouts": 0, "query_errors": 0, "resizes": 0}
+
+        self._tick_waits = []
+        self._tick_queries = []
+        self._tick_peak = 0
+        self._best_query_p50 = None
+        self._adapter = None
+
+    # -----------------------------
+    # Acquire / Release
+    # -----------------------------
+    def acquire(self, *, timeout=None):
+        return _AcquireContext(self, timeout)
+
+    async def _acquire(self, timeout=None):
+        t0 = time.perf_counter()
+        async with self._cond:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: self.in_use < self.limit), timeout
+                )
+            except asyncio.TimeoutError:
+                self.counters["acquire_timeouts"] += 1
+                raise
+            finally:
+                self.waiting -= 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self._tick_peak = max(self._tick_peak, self.in_use)
+
+        try:
+            conn = await self._pool.acquire(timeout=timeout)
+        except BaseException:
+            await self._give_back()
+            raise
+
+        wait_ms = (time.perf_counter() - t0) * 1000
+        self.acquire_waits.append(wait_ms)
+        self._tick_waits.append(wait_ms)
+        self.counters["acquired"] += 1
+        return conn
+
+    async def release(self, conn, *, timeout=None):
+        try:
+            await self._pool.release(conn, timeout=timeout)
+        finally:
+            await self._give_back()
+
+    async def _give_back(self):
+        async with self._cond:
+            self.in_use -= 1
+            self._cond.notify()
+
+    # same shortcuts as asyncpg.Pool, routed through the gate
+    async def execute(self, *args, **kwargs):
+        async with self.acquire() as conn:
+            return await conn.execute(*args, **kwargs)
+
+    async def executemany(self, *args, **kwargs):
+        async with self.acquire() as conn:
+            return await conn.executemany(*args, **kwargs)
+
+    async def fetch(self, *args, **kwargs):
+        async with self.acquire() as conn:
+            return await conn.fetch(*args, **kwargs)
+
+    async def fetchrow(self, *args, **kwargs):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(*args, **kwargs)
+
+    async def fetchval(self, *args, **kwargs):
+        async with self.acquire() as conn:
+            return await conn.fetchval(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        # get_size(), terminate(), is_closing() ... straight from asyncpg
+        return getattr(self._pool, attr)
+
+    async def close(self):
+        if self._adapter:
+            self._adapter.cancel()
+        logger.info(f"pool {self.name} closing: {self.describe()}")
+        await self._pool.close()
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def _on_query(self, record):
+        """asyncpg query logger callback (asyncpg >= 0.29)."""
+        ms = record.elapsed * 1000
+        self.query_times.append(ms)
+        self._tick_queries.append(ms)
+        if record.exception is not None:
+            self.counters["query_errors"] += 1
+
+        key = " ".join(record.query.split())[:120]
+        entry = self.queries.get(key)
+        if entry is None:
+            entry = self.queries[key] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += ms
+        entry[2] = max(entry[2], ms)
+
+    def metrics(self):
+        slowest = sorted(self.queries.items(), key=lambda kv: kv[1][1], reverse=True)[:TOP_QUERIES]
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "adaptive": self.adaptive,
+            "open_connections": self._pool.get_size(),
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "waiting": self.waiting,
+            "acquire_wait_ms": _summary(self.acquire_waits),
+            "query_ms": _summary(self.query_times),
+            "top_queries_by_total_ms": [
+                {"query": q, "count": c, "total_ms": round(t, 1), "max_ms": round(m, 1)}
+                for q, (c, t, m) in slowest
+            ],
+            **self.counters,
+        }
+
+    def describe(self):
+        """One log line."""
+        w, q = _summary(self.acquire_waits), _summary(self.query_times)
+        return (
+            f"limit={self.limit} peak_in_use={self.peak_in_use} acquired={self.counters['acquired']} "
+            f"wait_p50={w['p50']}ms wait_p95={w['p95']}ms query_p50={q['p50']}ms query_p95={q['p95']}ms"
+        )
+
+    # -----------------------------
+    # Adaptive Limit
+    # -----------------------------
+    async def set_limit(self, limit):
+        limit = max(self.min_size, min(self.max_size, limit))
+        if limit == self.limit:
+            return
+        async with self._cond:
+            self.limit = limit
+            self.counters["resizes"] += 1
+            self._cond.notify_all()
+
+    async def _adapt_loop(self):
+        while True:
+            await asyncio.sleep(ADAPT_INTERVAL_S)
+            waits, queries, peak = self._tick_waits, self._tick_queries, self._tick_peak
+            self._tick_waits, self._tick_queries, self._tick_peak = [], [], self.in_use
+            await self._adapt(waits, queries, peak)
+
+    async def _adapt(self, waits, queries, peak):
+        wait_p95 = _summary(waits)["p95"] or 0
+        query_p50 = _summary(queries)["p50"]
+        if query_p50 is not None:
+            self._best_query_p50 = min(self._best_query_p50 or query_p50, query_p50)
+
+        old = self.limit
+        if wait_p95 > TARGET_WAIT_MS and self.limit < self.max_size:
+            if query_p50 is not None and query_p50 > self._best_query_p50 * MAX_QUERY_SLOWDOWN:
+                logger.info(
+                    f"pool {self.name}: holding at {self.limit}, queries slowed to {query_p50:.1f}ms "
+                    f"(best {self._best_query_p50:.1f}ms) -> Postgres is the bottleneck"
+                )
+                return
+            await self.set_limit(self.limit + 1)
+        elif wait_p95 < TARGET_WAIT_MS / 10 and peak < self.limit - 1:
+            await self.set_limit(self.limit - 1)
+
+        if self.limit != old:
+            logger.info(
+                f"pool {self.name}: limit {old} -> {self.limit} "
+                f"(acquire p95 {wait_p95:.1f}ms, peak in use {peak}, query p50 {query_p50}ms)"
+            )
+
+
+async def create_pool(db_url, *, name=None, min_size=None, max_size=None,
+                      statement_timeout_ms=None, statement_cache_size=None,
+                      command_timeout=None, adaptive=None, **connect_kwargs):
+    name = name or os.path.basename(sys.argv[0] or "python") or "python"
+    min_size = min_size if min_size is not None else _env_int("DB_POOL_MIN", DEFAULT_MIN_SIZE)
+    max_size = max_size if max_size is not None else _env_int("DB_POOL_MAX", DEFAULT_MAX_SIZE)
+    min_size = min(min_size, max_size)
+    if statement_timeout_ms is None:
+        statement_timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", DEFAULT_STATEMENT_TIMEOUT_MS)
+    if statement_cache_size is None:
+        statement_cache_size = _env_int("DB_STATEMENT_CACHE", DEFAULT_STATEMENT_CACHE)
+    if adaptive is None:
+        adaptive = os.getenv("DB_POOL_ADAPTIVE", "0") == "1"
+
+    holder = {}
+
+    async def init(conn):
+        # per-query latency; older asyncpg just goes without it
+        if hasattr(conn, "add_query_logger"):
+            conn.add_query_logger(lambda record: holder["pool"]._on_query(record))
+
+    server_settings = dict(connect_kwargs.pop("server_settings", None) or {})
+    server_settings.setdefault("application_name", name[:63])
+    server_settings.setdefault("statement_timeout", str(statement_timeout_ms))
+
+    raw = await asyncpg.create_pool(
+        db_url,
+        min_size=min_size,
+        max_size=max_size,
+        statement_cache_size=statement_cache_size,
+        command_timeout=command_timeout,
+        server_settings=server_settings,
+        init=init,
+        **connect_kwargs
+    )
+    pool = holder["pool"] = InstrumentedPool(raw, name, min_size, max_size, adaptive)
+    if adaptive:
+        pool._adapter = asyncio.create_task(pool._adapt_loop())
+
+    logger.info(
+        f"pool {name}: size {min_size}-{max_size}{' (adaptive)' if adaptive else ''}, "
+        f"statement_timeout={statement_timeout_ms}ms, statement_cache={statement_cache_size}"
+    )
+    return pool
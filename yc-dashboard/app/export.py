@@ -0,0 +1,202 @@
+"""
+Streaming bulk export: every company with its latest snapshot, scores and
+web enrichment, read through a server-side cursor and written in chunks.
+
+CLI (from yc-dashboard/):
+    DB_URL=postgresql://... python -m app.export --format parquet --out companies.parquet
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+
+DEFAULT_CHUNK_SIZE = 5000
+FORMATS = ("ndjson", "csv", "parquet")
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# latest snapshot via company_latest: one indexed lookup per company, no history sort
+EXPORT_SQL = """
+    SELECT
+        c.id, c.yc_company_id, c.name, c.domain, c.is_active,
+        c.first_seen_at, c.last_seen_at,
+        l.batch, l.stage, l.location, s.description, l.tags::text AS tags,
+        s.employee_range, l.scraped_at AS snapshot_at,
+        cs.momentum_score, cs.stability_score,
+        e.has_careers_page, e.has_blog, e.contact_email, e.scraped_at AS enriched_at
+    FROM companies c
+    LEFT JOIN company_latest l ON l.company_id = c.id
+    LEFT JOIN company_snapshots s ON s.id = l.snapshot_id AND s.scraped_at = l.scraped_at
+    LEFT JOIN company_scores cs ON cs.company_id = c.id
+    LEFT JOIN company_web_enrichment e ON e.company_id = c.id
+    ORDER BY c.id
+"""
+
+# column -> parquet type, fixed up front so every row group has the same schema
+COLUMNS = [
+    ("id", "int64"), ("yc_company_id", "string"), ("name", "string"), ("domain", "string"),
+    ("is_active", "bool"), ("first_seen_at", "timestamp"), ("last_seen_at", "timestamp"),
+    ("batch", "string"), ("stage", "string"), ("location", "string"), ("description", "string"),
+    ("tags", "string"), ("employee_range", "string"), ("snapshot_at", "timestamp"),
+    ("momentum_score", "float64"), ("stability_score", "float64"),
+    ("has_careers_page", "bool"), ("has_blog", "bool"), ("contact_email", "string"),
+    ("enriched_at", "timestamp"),
+]
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+async def iter_chunks(conn, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of row tuples; memory stays at one chunk no matter how big the table is."""
+    # asyncpg cursors only live inside a transaction
+    async with conn.transaction(readonly=True, isolation="repeatable_read"):
+        cursor = await conn.cursor(EXPORT_SQL)
+        while True:
+            rows = await cursor.fetch(chunk_size)
+            if not rows:
+                break
+            yield [tuple(_plain(v) for v in r.values()) for r in rows]
+
+
+# -----------------------------
+# Encoders
+# -----------------------------
+async def encode_ndjson(chunks):
+    async for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(COLUMN_NAMES, r)), default=str) + "\n" for r in rows
+        ).encode("utf-8")
+
+
+async def encode_csv(chunks):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMN_NAMES)
+    async for rows in chunks:
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever pyarrow wrote since the last take()."""
+
+    def __init__(self):
+        self.parts = []
+        self.pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.parts.append(bytes(b))
+        self.pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self.pos
+
+    def take(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("parquet export needs pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+async def encode_parquet(chunks):
+    pa, pq = require_pyarrow()
+    types = {
+        "int64": pa.int64(), "string": pa.string(), "bool": pa.bool_(),
+        "float64": pa.float64(), "timestamp": pa.timestamp("us"),
+    }
+    schema = pa.schema([(name, types[t]) for name, t in COLUMNS])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    async for rows in chunks:
+        # one row group per chunk
+        columns = list(zip(*rows))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(col, type=schema.field(i).type) for i, col in enumerate(columns)],
+            schema=schema
+        ))
+        data = sink.take()
+        if data:
+            yield data
+    writer.close()
+    yield sink.take()
+
+
+ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv, "parquet": encode_parquet}
+
+
+async def stream_export(pool, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Async iterator of encoded bytes, holding one pooled connection for the whole export."""
+    if fmt == "parquet":
+        require_pyarrow()
+    async with pool.acquire() as conn:
+        async for data in ENCODERS[fmt](iter_chunks(conn, chunk_size)):
+            yield data
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+async def export_to_file(db_url, fmt, out, chunk_size):
+    from app.db_logic import get_db_pool, ensure_latest_table
+
+    pool = await get_db_pool(db_url)
+    # the API does this at startup; the CLI may be the first thing to touch company_latest
+    async with pool.acquire() as conn:
+        await ensure_latest_table(conn)
+    t0 = time.perf_counter()
+    written = 0
+    try:
+        f = sys.stdout.buffer if out == "-" else open(out, "wb")
+        try:
+            async for data in stream_export(pool, fmt, chunk_size):
+                f.write(data)
+                written += len(data)
+        finally:
+            if f is not sys.stdout.buffer:
+                f.close()
+    finally:
+        await pool.close()
+    print(f"exported {written / 1e6:.1f} MB as {fmt} in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export companies with latest snapshot, scores and enrichment")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--out", default="-", help="file path, or - for stdout")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--db-url", default=os.getenv("DB_URL"))
+    args = parser.parse_args()
+
+    if not args.db_url:
+        parser.error("set --db-url or DB_URL")
+    asyncio.run(export_to_file(args.db_url, args.format, args.out, args.chunk_size))
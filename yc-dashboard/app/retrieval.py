@@ -0,0 +1,193 @@
+import re
+import time
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# rough chars-per-token for phi3 style tokenizers, good enough for budgeting
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 1500
+DEFAULT_TOP_N = 15
+CHANGES_PER_COMPANY = 3
+RECENT_DAYS = 90
+DESCRIPTION_CHARS = 160
+
+# -----------------------------
+# Question Parsing
+# -----------------------------
+BATCH_RE = re.compile(r"\b([wsf])\s?'?(\d{2})\b", re.IGNORECASE)
+SEASONS = {"w": "Winter", "s": "Summer", "f": "Fall"}
+
+CHANGE_KEYWORDS = {
+    "stage": "STAGE_CHANGE",
+    "acquired": "STAGE_CHANGE",
+    "public": "STAGE_CHANGE",
+    "location": "LOCATION_CHANGE",
+    "moved": "LOCATION_CHANGE",
+    "relocated": "LOCATION_CHANGE",
+    "tag": "TAG_CHANGE",
+    "tags": "TAG_CHANGE",
+    "description": "DESCRIPTION_CHANGE",
+    "pivot": "DESCRIPTION_CHANGE",
+    "pivoted": "DESCRIPTION_CHANGE",
+}
+
+# words that describe the question, not the companies
+QUESTION_WORDS = {
+    "a", "an", "and", "are", "as", "at", "by", "did", "do", "does", "for", "from",
+    "has", "have", "how", "in", "is", "it", "many", "me", "most", "of", "on", "or",
+    "show", "list", "tell", "that", "the", "their", "them", "there", "these", "this",
+    "to", "was", "were", "what", "when", "where", "which", "who", "why", "with",
+    "company", "companies", "startup", "startups", "yc", "batch", "changed", "change",
+    "changes", "recent", "recently", "lately", "new", "latest",
+}
+
+
+def parse_question(question):
+    """Pull structured hints (batches, change types) and free-text terms out of a question."""
+    text = question.lower()
+
+    batches = []
+    for season, year in BATCH_RE.findall(text):
+        # the directory has used both "W24" and "Winter 2024" over time
+        batches.append(f"{season.upper()}{year}")
+        batches.append(f"{SEASONS[season.lower()]} 20{year}")
+    text = BATCH_RE.sub(" ", text)
+
+    words = re.findall(r"[a-z0-9]+", text)
+    change_types = sorted({CHANGE_KEYWORDS[w] for w in words if w in CHANGE_KEYWORDS})
+
+    terms = [
+        w for w in words
+        if w not in QUESTION_WORDS and w not in CHANGE_KEYWORDS and len(w) > 1
+    ]
+
+    return {
+        "batches": batches or None,
+        "change_types": change_types or None,
+        # OR the terms, AND-ing a whole sentence matches nothing
+        "tsquery": " | ".join(dict.fromkeys(terms)) or None,
+    }
+
+
+# -----------------------------
+# Retrieval
+# -----------------------------
+RETRIEVE_SQL = """
+    SELECT
+        c.id, c.name, s.batch, s.stage, s.location, s.description, s.tags,
+        cs.momentum_score, cs.stability_score,
+        CASE WHEN $1::text IS NULL THEN 0
+             ELSE ts_rank(c.search_vector, to_tsquery('english', $1)) END AS rank
+    FROM company_latest l
+    JOIN companies c ON c.id = l.company_id
+    -- one indexed lookup per hit, straight into the right partition
+    JOIN company_snapshots s ON s.id = l.snapshot_id AND s.scraped_at = l.scraped_at
+    LEFT JOIN company_scores cs ON cs.company_id = c.id
+    WHERE ($1::text IS NULL OR NOT $5::boolean OR c.search_vector @@ to_tsquery('english', $1))
+      AND ($2::text[] IS NULL OR l.batch = ANY($2::text[]))
+      AND ($3::text[] IS NULL OR EXISTS (
+            SELECT 1 FROM company_changes cc
+            WHERE cc.company_id = c.id
+              AND cc.change_type = ANY($3::text[])
+              AND cc.detected_at > NOW() - make_interval(days => $6)
+      ))
+    ORDER BY rank DESC, cs.momentum_score DESC NULLS LAST, c.id
+    LIMIT $4
+"""
+
+
+async def retrieve_companies(conn, question, top_n=DEFAULT_TOP_N):
+    """Top-N companies relevant to a free-form question, plus their recent changes."""
+    hints = parse_question(question)
+    args = (hints["tsquery"], hints["batches"], hints["change_types"], top_n)
+
+    rows = await conn.fetch(RETRIEVE_SQL, *args, True, RECENT_DAYS)
+    if not rows and hints["tsquery"]:
+        # text matched nothing under the filters, keep it for ranking only
+        rows = await conn.fetch(RETRIEVE_SQL, *args, False, RECENT_DAYS)
+
+    companies = [dict(r) for r in rows]
+    if not companies:
+        return hints, []
+
+    changes = await conn.fetch("""
+        SELECT company_id, change_type, old_value, new_value, detected_at
+        FROM (
+            SELECT cc.*, ROW_NUMBER() OVER (
+                PARTITION BY company_id ORDER BY detected_at DESC
+            ) AS rn
+            FROM company_changes cc
+            WHERE company_id = ANY($1::int[])
+        ) t
+        WHERE rn <= $2
+        ORDER BY company_id, detected_at DESC
+    """, [c["id"] for c in companies], CHANGES_PER_COMPANY)
+
+    by_company = {}
+    for ch in changes:
+        by_company.setdefault(ch["company_id"], []).append(dict(ch))
+    for c in companies:
+        c["changes"] = by_company.get(c["id"], [])
+
+    return hints, companies
+
+
+# -----------------------------
+# Context Assembly
+# -----------------------------
+def _short(value, limit):
+    value = (value or "").replace("\n", " ").strip()
+    return value if len(value) <= limit else value[:limit - 1] + "…"
+
+
+def format_company_line(c):
+    tags = c.get("tags")
+    if isinstance(tags, str):
+        tags = json.loads(tags)
+    parts = [
+        c["name"],
+        c.get("batch") or "?",
+        c.get("stage") or "?",
+        c.get("location") or "?",
+        f"momentum {c.get('momentum_score') if c.get('momentum_score') is not None else 'N/A'}",
+        f"tags: {', '.join(tags[:5])}" if tags else "",
+        _short(c.get("description"), DESCRIPTION_CHARS),
+    ]
+    line = "- " + " | ".join(p for p in parts if p)
+
+    for ch in c.get("changes", []):
+        line += (
+            f"\n    {ch['change_type']}: {_short(ch['old_value'], 40)} → "
+            f"{_short(ch['new_value'], 40)} ({ch['detected_at']:%Y-%m-%d})"
+        )
+    return line
+
+
+def build_context(companies, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Compact per-company lines, most relevant first, until the token budget is used up."""
+    lines = []
+    used = 0
+    for c in companies:
+        line = format_company_line(c)
+        cost = len(line) // CHARS_PER_TOKEN + 1
+        if used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines), len(lines)
+
+
+async def retrieve_context(conn, question, top_n=DEFAULT_TOP_N, token_budget=DEFAULT_TOKEN_BUDGET):
+    t0 = time.perf_counter()
+    hints, companies = await retrieve_companies(conn, question, top_n)
+    retrieval_ms = (time.perf_counter() - t0) * 1000
+
+    context, used = build_context(companies, token_budget)
+
+    logger.info(
+        f"retrieval: {len(companies)} candidates, {used} in context, "
+        f"{retrieval_ms:.1f}ms, ~{len(context) // CHARS_PER_TOKEN} tokens, hints={hints}"
+    )
+    return context, companies[:used], retrieval_ms
@@ -0,0 +1,187 @@
+import json
+import re
+import time
+import zlib
+import asyncio
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# hashed TF-IDF, no vocabulary to maintain and no network / model download
+DIMENSIONS = 2048
+TAG_WEIGHT = 3.0
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "to", "we", "with", "your", "you",
+}
+
+# how often a query may trigger a "did anything change?" check against the DB
+REFRESH_INTERVAL_S = 60
+
+
+def _bucket(token):
+    # crc32 instead of hash(): stable across processes and restarts
+    return zlib.crc32(token.encode("utf-8")) % DIMENSIONS
+
+
+def tokenize(description, tags):
+    tokens = [
+        t for t in TOKEN_RE.findall((description or "").lower())
+        if len(t) > 1 and t not in STOPWORDS
+    ]
+    tag_tokens = ["tag:" + t.lower() for t in (tags or [])]
+    return tokens, tag_tokens
+
+
+def term_counts(description, tags):
+    """Hashed term-frequency vector for one company."""
+    vec = np.zeros(DIMENSIONS, dtype=np.float32)
+    tokens, tag_tokens = tokenize(description, tags)
+    for t in tokens:
+        vec[_bucket(t)] += 1.0
+    for t in tag_tokens:
+        vec[_bucket(t)] += TAG_WEIGHT
+    return vec
+
+
+def _parse_tags(raw):
+    if not raw:
+        return []
+    return json.loads(raw) if isinstance(raw, str) else raw
+
+
+class SimilarityIndex:
+    """
+    In-memory hashed TF-IDF matrix over the latest snapshot of every company.
+    Rows are L2-normalized, so similarity is a single matrix-vector product.
+    IDF is fixed at the last full build; incremental refreshes reuse it.
+    """
+
+    def __init__(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.names = []
+        self.row_of = {}
+        self.matrix = np.zeros((0, DIMENSIONS), dtype=np.float32)
+        self.idf = np.ones(DIMENSIONS, dtype=np.float32)
+        self.watermark = None        # newest snapshot scraped_at in the index (None = no snapshots yet)
+        self.built = False
+        self.last_check = 0.0
+        self.lock = asyncio.Lock()
+
+    @property
+    def ready(self):
+        # an empty table is a valid, cached state too
+        return self.built
+
+    def _weigh(self, counts):
+        weighted = counts * self.idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return weighted / norms
+
+    async def _fetch_latest(self, conn, since=None):
+        return await conn.fetch("""
+            SELECT DISTINCT ON (s.company_id)
+                s.company_id, c.name, s.description, s.tags, s.scraped_at
+            FROM company_snapshots s
+            JOIN companies c ON c.id = s.company_id
+            WHERE $1::timestamp IS NULL OR s.company_id IN (
+                SELECT company_id FROM company_snapshots WHERE scraped_at > $1
+            )
+            ORDER BY s.company_id, s.scraped_at DESC
+        """, since)
+
+    async def build(self, conn):
+        t0 = time.perf_counter()
+        rows = await self._fetch_latest(conn)
+
+        counts = np.zeros((len(rows), DIMENSIONS), dtype=np.float32)
+        for i, r in enumerate(rows):
+            counts[i] = term_counts(r["description"], _parse_tags(r["tags"]))
+
+        # smoothed idf over bucket document frequency
+        df = np.count_nonzero(counts, axis=0).astype(np.float32)
+        self.idf = np.log((1 + len(rows)) / (1 + df)) + 1.0
+
+        self.ids = np.array([r["company_id"] for r in rows], dtype=np.int64)
+        self.names = [r["name"] for r in rows]
+        self.row_of = {cid: i for i, cid in enumerate(self.ids.tolist())}
+        self.matrix = self._weigh(counts)
+        self.watermark = max((r["scraped_at"] for r in rows), default=None)
+        self.last_check = time.monotonic()
+        self.built = True
+
+        logger.info(f"similarity index built: {len(rows)} companies in {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+    async def refresh(self, conn):
+        """Re-vectorize only companies with a snapshot newer than the watermark."""
+        self.last_check = time.monotonic()
+        rows = await self._fetch_latest(conn, since=self.watermark)
+        if not rows:
+            return 0
+
+        counts = np.stack([term_counts(r["description"], _parse_tags(r["tags"])) for r in rows])
+        vectors = self._weigh(counts)
+
+        new_ids, new_names, new_vectors = [], [], []
+        for r, vec in zip(rows, vectors):
+            cid = r["company_id"]
+            if cid in self.row_of:
+                row = self.row_of[cid]
+                self.matrix[row] = vec
+                self.names[row] = r["name"]
+            else:
+                new_ids.append(cid)
+                new_names.append(r["name"])
+                new_vectors.append(vec)
+
+        if new_ids:
+            start = len(self.ids)
+            self.ids = np.concatenate([self.ids, np.array(new_ids, dtype=np.int64)])
+            self.names.extend(new_names)
+            self.matrix = np.vstack([self.matrix, np.stack(new_vectors)])
+            for offset, cid in enumerate(new_ids):
+                self.row_of[cid] = start + offset
+
+        self.watermark = max([self.watermark] + [r["scraped_at"] for r in rows])
+        logger.info(f"similarity index refreshed: {len(rows)} companies ({len(new_ids)} new)")
+        return len(rows)
+
+    async def ensure_fresh(self, pool):
+        """Build on first use, then at most one cheap change check per REFRESH_INTERVAL_S."""
+        if self.ready and time.monotonic() - self.last_check < REFRESH_INTERVAL_S:
+            return
+        async with self.lock:
+            if self.ready and time.monotonic() - self.last_check < REFRESH_INTERVAL_S:
+                return
+            async with pool.acquire() as conn:
+                # built over an empty table: the first rows get a proper build (and idf)
+                if self.ready and self.watermark is not None:
+                    await self.refresh(conn)
+                else:
+                    await self.build(conn)
+
+    def top_k(self, company_id, k=10):
+        """Top-k most similar companies, or None if the company isn't indexed."""
+        row = self.row_of.get(company_id)
+        if row is None:
+            return None
+
+        scores = self.matrix @ self.matrix[row]
+        scores[row] = -np.inf
+
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+
+        # argpartition is O(n), then only the k winners get sorted
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {"id": int(self.ids[i]), "name": self.names[i], "score": round(float(scores[i]), 4)}
+            for i in top
+        ]
@@ -0,0 +1,435 @@
+"""
+Tiered snapshot history.
+
+Hot tier:  company_snapshots, range-partitioned by month on scraped_at.
+Cold tier: one zstd Parquet file per compacted partition (snapshot_archives
+           says which file covers which time range).
+
+Compaction exports a cold partition in full, then deletes everything in it
+except each company's first and latest snapshot and the snapshots where a
+company_changes row was recorded (same transaction -> same NOW()).
+snapshot_as_of() merges both tiers.
+
+CLI (from yc-dashboard/):
+    DB_URL=postgresql://... python -m app.snapshot_store migrate
+    DB_URL=postgresql://... python -m app.snapshot_store compact --keep-months 3
+    DB_URL=postgresql://... python -m app.snapshot_store as-of 42 2025-06-01
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+from datetime import datetime, date
+
+from app.export import require_pyarrow
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("SNAPSHOT_ARCHIVE_DIR", "snapshot_archive")
+PARTITION_PREFIX = "company_snapshots_p"
+LEGACY_PARTITION = "company_snapshots_legacy"
+DEFAULT_PARTITION = "company_snapshots_default"
+MONTHS_AHEAD = 2
+DEFAULT_KEEP_MONTHS = 3
+ARCHIVE_ROW_GROUP = 50000
+
+ARCHIVE_COLUMNS = [
+    ("id", "int64"), ("company_id", "int64"), ("batch", "string"), ("stage", "string"),
+    ("description", "string"), ("location", "string"), ("tags", "string"),
+    ("employee_range", "string"), ("scraped_at", "timestamp"), ("data_hash", "string"),
+]
+ARCHIVE_COLUMN_NAMES = [name for name, _ in ARCHIVE_COLUMNS]
+
+ARCHIVES_DDL = """
+    CREATE TABLE IF NOT EXISTS snapshot_archives (
+        partition_name  TEXT PRIMARY KEY,
+        range_start     TIMESTAMP NOT NULL,
+        range_end       TIMESTAMP NOT NULL,
+        path            TEXT NOT NULL,
+        row_count       INT NOT NULL,
+        kept_hot        INT NOT NULL,
+        archived_at     TIMESTAMP DEFAULT NOW()
+    );
+"""
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def month_start(d):
+    return datetime(d.year, d.month, 1)
+
+
+def add_months(d, n):
+    m = d.month - 1 + n
+    return datetime(d.year + m // 12, m % 12 + 1, 1)
+
+
+def partition_name(d):
+    return f"{PARTITION_PREFIX}{d:%Y%m}"
+
+
+async def is_partitioned(conn):
+    return await conn.fetchval(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('company_snapshots')"
+    ) or False
+
+
+async def list_partitions(conn):
+    """[(name, range_start, range_end)] for every range partition, oldest first."""
+    rows = await conn.fetch("""
+        SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'company_snapshots'::regclass
+    """)
+    parts = []
+    for r in rows:
+        m = _BOUND_RE.search(r["bound"])
+        if m:  # the DEFAULT partition has no bounds
+            parts.append((r["name"], datetime.fromisoformat(m.group(1)), datetime.fromisoformat(m.group(2))))
+    return sorted(parts, key=lambda p: p[1])
+
+
+# -----------------------------
+# Partition Maintenance
+# -----------------------------
+async def ensure_partitions(conn, months_ahead=MONTHS_AHEAD):
+    """Monthly partitions from the current month to `months_ahead` out. No-op on an unpartitioned table."""
+    if not await is_partitioned(conn):
+        return []
+
+    parts = await list_partitions(conn)
+    start = month_start(datetime.utcnow())
+    if parts:
+        start = max(start, parts[-1][2])
+    end = add_months(month_start(datetime.utcnow()), months_ahead + 1)
+
+    created = []
+    while start < end:
+        name = partition_name(start)
+        try:
+            # savepoint when called inside migrate's transaction
+            async with conn.transaction():
+                await create_partition(conn, name, start, add_months(start, 1))
+            created.append(name)
+        except Exception as e:
+            # rows keep landing in DEFAULT meanwhile; never worth failing startup over
+            logger.error(f"could not create partition {name}: {e}")
+        start = add_months(start, 1)
+    return created
+
+
+async def create_partition(conn, name, lo, hi):
+    """
+    CREATE ... PARTITION OF fails if DEFAULT already holds rows in [lo, hi)
+    (written before the month's partition existed, e.g. by a writer that never
+    runs ensure_partitions). Those rows are moved into the new partition first.
+    Call inside a transaction.
+    """
+    bounds = f"FROM ('{lo:%Y-%m-%d}') TO ('{hi:%Y-%m-%d}')"
+    stray = False
+    if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", DEFAULT_PARTITION):
+        stray = await conn.fetchval(f"""
+            SELECT EXISTS (
+                SELECT 1 FROM {DEFAULT_PARTITION} WHERE scraped_at >= $1 AND scraped_at < $2
+            )
+        """, lo, hi)
+
+    if not stray:
+        await conn.execute(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF company_snapshots FOR VALUES {bounds}")
+        return
+
+    # DEFAULT off to the side while the month is split out of it
+    await conn.execute(f"ALTER TABLE company_snapshots DETACH PARTITION {DEFAULT_PARTITION}")
+    await conn.execute(f"CREATE TABLE {name} PARTITION OF company_snapshots FOR VALUES {bounds}")
+    moved = await conn.execute(f"""
+        INSERT INTO {name}
+        SELECT * FROM {DEFAULT_PARTITION} WHERE scraped_at >= $1 AND scraped_at < $2
+    """, lo, hi)
+    await conn.execute(
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE scraped_at >= $1 AND scraped_at < $2", lo, hi
+    )
+    await conn.execute(f"ALTER TABLE company_snapshots ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    logger.warning(f"{name}: moved stray rows out of {DEFAULT_PARTITION} ({moved})")
+
+
+async def migrate_to_partitions(conn):
+    """
+    One-off: turn company_snapshots into a partitioned table.
+    The existing table is attached as a single partition covering its data
+    (no rows are copied), new months get their own partitions.
+    """
+    if await is_partitioned(conn):
+        logger.info("company_snapshots is already partitioned")
+        return False
+
+    async with conn.transaction():
+        bounds = await conn.fetchrow("SELECT MIN(scraped_at) AS lo, MAX(scraped_at) AS hi FROM company_snapshots")
+
+        # compaction deletes rows, so hard references to snapshot ids can't stay
+        refs = await conn.fetch("""
+            SELECT conrelid::regclass::text AS tbl, conname
+            FROM pg_constraint
+            WHERE contype = 'f' AND confrelid = 'company_snapshots'::regclass
+        """)
+        for r in refs:
+            logger.warning(f"dropping FK {r['conname']} on {r['tbl']} (snapshots may move to the archive)")
+            await conn.execute(f'ALTER TABLE {r["tbl"]} DROP CONSTRAINT "{r["conname"]}"')
+
+        # the latest/tags trigger moves to the new parent (and from there onto every partition)
+        await conn.execute("DROP TRIGGER IF EXISTS trg_company_latest ON company_snapshots")
+        await conn.execute(f"ALTER TABLE company_snapshots RENAME TO {LEGACY_PARTITION}")
+        await conn.execute(f"""
+            CREATE TABLE company_snapshots (LIKE {LEGACY_PARTITION} INCLUDING DEFAULTS)
+            PARTITION BY RANGE (scraped_at)
+        """)
+        await conn.execute("ALTER TABLE company_snapshots ADD PRIMARY KEY (id, scraped_at)")
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_snapshots_company_time
+            ON company_snapshots (company_id, scraped_at DESC)
+        """)
+        # the id sequence keeps counting from where it was
+        seq = await conn.fetchval("SELECT pg_get_serial_sequence($1, 'id')", LEGACY_PARTITION)
+        if seq:
+            await conn.execute(f"ALTER SEQUENCE {seq} OWNED BY company_snapshots.id")
+
+        if bounds["lo"] is not None:
+            lo, hi = month_start(bounds["lo"]), add_months(month_start(bounds["hi"]), 1)
+            # fails loudly if any legacy row has a NULL scraped_at
+            await conn.execute(f"ALTER TABLE {LEGACY_PARTITION} ALTER COLUMN scraped_at SET NOT NULL")
+            await conn.execute(f"""
+                ALTER TABLE company_snapshots ATTACH PARTITION {LEGACY_PARTITION}
+                FOR VALUES FROM ('{lo:%Y-%m-%d}') TO ('{hi:%Y-%m-%d}')
+            """)
+        else:
+            await conn.execute(f"DROP TABLE {LEGACY_PARTITION}")
+
+        await conn.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF company_snapshots DEFAULT")
+        await ensure_partitions(conn)
+
+        from app.db_logic import LATEST_TRIGGER_DDL
+        await conn.execute(LATEST_TRIGGER_DDL)
+
+    logger.info("company_snapshots is now partitioned by month")
+    return True
+
+
+# -----------------------------
+# Compaction
+# -----------------------------
+# rows in one partition that must stay hot
+KEEP_SQL = """
+    SELECT s.id
+    FROM {partition} s
+    WHERE s.id IN (SELECT snapshot_id FROM company_latest WHERE company_id = s.company_id)
+       OR NOT EXISTS (
+            SELECT 1 FROM company_snapshots f
+            WHERE f.company_id = s.company_id AND f.scraped_at < s.scraped_at
+       )
+       OR EXISTS (
+            SELECT 1 FROM company_changes ch
+            WHERE ch.company_id = s.company_id AND ch.detected_at = s.scraped_at
+       )
+"""
+
+
+class ArchiveWriter:
+    """
+    Blocking: zstd Parquet, one row group per chunk, written to path + ".tmp"
+    and moved into place by close(). Chunks come in ordered by company_id,
+    scraped_at, so row-group stats skip most of the file on lookups.
+    """
+
+    def __init__(self, path):
+        self.pa, self.pq = require_pyarrow()
+        types = {"int64": self.pa.int64(), "string": self.pa.string(), "timestamp": self.pa.timestamp("us")}
+        self.schema = self.pa.schema([(name, types[t]) for name, t in ARCHIVE_COLUMNS])
+        self.path = path
+        self.tmp = path + ".tmp"
+        self.rows = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.writer = self.pq.ParquetWriter(self.tmp, self.schema, compression="zstd")
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        self.writer.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(col, type=self.schema.field(i).type) for i, col in enumerate(columns)],
+            schema=self.schema
+        ))
+        self.rows += len(rows)
+
+    def close(self):
+        """Finish the file; returns the row count read back from its footer."""
+        self.writer.close()
+        os.replace(self.tmp, self.path)
+        return self.pq.ParquetFile(self.path).metadata.num_rows
+
+    def abort(self):
+        self.writer.close()
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+
+async def compact_partition(conn, name, range_start, range_end, archive_dir=ARCHIVE_DIR):
+    path = os.path.abspath(os.path.join(archive_dir, "company_snapshots", f"{name}.parquet"))
+    writer = await asyncio.to_thread(ArchiveWriter, path)
+
+    # stream the partition: memory stays at one row group however big the month was
+    try:
+        async with conn.transaction(readonly=True, isolation="repeatable_read"):
+            # same snapshot as the cursor, so the counts must match exactly
+            expected = await conn.fetchval(f"SELECT COUNT(*) FROM {name}")
+            cursor = await conn.cursor(f"""
+                SELECT id, company_id, batch, stage, description, location, tags::text AS tags,
+                       employee_range, scraped_at, data_hash
+                FROM {name}
+                ORDER BY company_id, scraped_at
+            """)
+            while True:
+                chunk = await cursor.fetch(ARCHIVE_ROW_GROUP)
+                if not chunk:
+                    break
+                await asyncio.to_thread(writer.write, [tuple(r.values()) for r in chunk])
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        raise
+
+    written = await asyncio.to_thread(writer.close)
+    if written != expected or writer.rows != expected:
+        raise RuntimeError(f"{name}: archive has {written} rows, partition has {expected}; not deleting")
+
+    async with conn.transaction():
+        kept = {r["id"] for r in await conn.fetch(KEEP_SQL.format(partition=name))}
+        await conn.execute(
+            f"DELETE FROM {name} WHERE NOT (id = ANY($1::int[]))", list(kept)
+        )
+        await conn.execute("""
+            INSERT INTO snapshot_archives
+            (partition_name, range_start, range_end, path, row_count, kept_hot)
+            VALUES ($1, $2, $3, $4, $5, $6)
+        """, name, range_start, range_end, path, written, len(kept))
+
+    logger.info(f"{name}: archived {written} rows to {path}, kept {len(kept)} hot")
+    return written, len(kept)
+
+
+async def compact(conn, keep_months=DEFAULT_KEEP_MONTHS, archive_dir=ARCHIVE_DIR):
+    """Archive + compact every partition that ended more than `keep_months` ago. Each partition only once."""
+    require_pyarrow()
+    await conn.execute(ARCHIVES_DDL)
+    if not await is_partitioned(conn):
+        raise RuntimeError("company_snapshots is not partitioned yet, run `migrate` first")
+
+    await ensure_partitions(conn)
+    cutoff = add_months(month_start(datetime.utcnow()), -keep_months)
+    done = {r["partition_name"] for r in await conn.fetch("SELECT partition_name FROM snapshot_archives")}
+
+    stats = []
+    for name, range_start, range_end in await list_partitions(conn):
+        if range_end <= cutoff and name not in done:
+            stats.append((name, *await compact_partition(conn, name, range_start, range_end, archive_dir)))
+    return stats
+
+
+# -----------------------------
+# Point-in-time Reader
+# -----------------------------
+def _read_archive(path, company_id, as_of):
+    """Blocking: newest archived row for company_id at or before as_of, as a dict."""
+    _, pq = require_pyarrow()
+    table = pq.read_table(
+        path,
+        filters=[("company_id", "=", company_id), ("scraped_at", "<=", as_of)]
+    )
+    if table.num_rows == 0:
+        return None
+    rows = table.to_pylist()
+    return max(rows, key=lambda r: r["scraped_at"])
+
+
+async def snapshot_as_of(conn, company_id, as_of):
+    """
+    The company's snapshot as it was at `as_of` (date or datetime), from
+    whichever tier holds it. None if the company had no snapshot yet.
+    """
+    if isinstance(as_of, date) and not isinstance(as_of, datetime):
+        as_of = datetime(as_of.year, as_of.month, as_of.day, 23, 59, 59, 999999)
+
+    hot = await conn.fetchrow("""
+        SELECT id, company_id, batch, stage, description, location, tags::text AS tags,
+               employee_range, scraped_at, data_hash
+        FROM company_snapshots
+        WHERE company_id = $1 AND scraped_at <= $2
+        ORDER BY scraped_at DESC
+        LIMIT 1
+    """, company_id, as_of)
+    best = dict(hot, tier="hot") if hot else None
+
+    # only archives newer than the hot hit can hold a better (compacted-away) row
+    has_archives = await conn.fetchval("SELECT to_regclass('snapshot_archives') IS NOT NULL")
+    archives = []
+    if has_archives:
+        archives = await conn.fetch("""
+            SELECT path FROM snapshot_archives
+            WHERE range_start <= $1 AND range_end > $2
+            ORDER BY range_start DESC
+        """, as_of, best["scraped_at"] if best else datetime.min)
+
+    for a in archives:
+        cold = await asyncio.to_thread(_read_archive, a["path"], company_id, as_of)
+        if cold:
+            if best is None or cold["scraped_at"] > best["scraped_at"]:
+                best = dict(cold, tier="cold")
+            # archives are newest-first and don't overlap, older ones can't do better
+            break
+
+    if best and isinstance(best["tags"], str):
+        best["tags"] = json.loads(best["tags"])
+    return best
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+async def main(args):
+    from app.db_logic import get_db_pool
+
+    # migrate / compact scan whole partitions, no statement timeout here
+    pool = await get_db_pool(args.db_url, statement_timeout_ms=0)
+    try:
+        async with pool.acquire() as conn:
+            if args.command == "migrate":
+                await migrate_to_partitions(conn)
+            elif args.command == "compact":
+                for name, total, kept in await compact(conn, args.keep_months, args.archive_dir):
+                    print(f"{name}: {total} archived, {kept} kept hot")
+            elif args.command == "as-of":
+                at = date.fromisoformat(args.at) if len(args.at) == 10 else datetime.fromisoformat(args.at)
+                snap = await snapshot_as_of(conn, args.company_id, at)
+                print(json.dumps(snap, default=str, indent=2))
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Partitioned snapshot history: migrate, compact, read as-of")
+    parser.add_argument("--db-url", default=os.getenv("DB_URL"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="convert company_snapshots to monthly partitions")
+    p = sub.add_parser("compact", help="archive old partitions to Parquet and prune them")
+    p.add_argument("--keep-months", type=int, default=DEFAULT_KEEP_MONTHS)
+    p.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    p = sub.add_parser("as-of", help="print a company's snapshot at a point in time")
+    p.add_argument("company_id", type=int)
+    p.add_argument("at", help="ISO date or datetime")
+    args = parser.parse_args()
+
+    if not args.db_url:
+        parser.error("set --db-url or DB_URL")
+    asyncio.run(main(args))